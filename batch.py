@@ -0,0 +1,119 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, TypedDict, TypeVar
+
+from project_io import IO
+from solvers import Grid, Solver, get_solver
+from sudoku import Status
+
+BatchResult = TypedDict('BatchResult', {'index': int,
+                                        'solution': Optional[List[List[int]]],
+                                        'status': Status,
+                                        'stats': Dict[str, float]})
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# warm state of each worker process: the solver is built once and reused for every chunk
+_solver: Optional[Solver] = None
+
+
+def _initialize(solver: str) -> None:
+    global _solver
+    _solver = get_solver(solver)
+
+
+def _solve_chunk(chunk: List[Tuple[int, Grid]]) -> List[BatchResult]:
+    assert _solver is not None
+    results: List[BatchResult] = []
+    for index, value in chunk:
+        result = _solver.solve(value)
+        results.append({'index': index,
+                        'solution': result['solution'],
+                        'status': result['status'],
+                        'stats': result['stats']})
+    return results
+
+
+def solve_batch(puzzles: Iterable[Grid], solver: str = 'dlx', workers: Optional[int] = None,
+                chunksize: int = 64, ordered: bool = True) -> Iterator[BatchResult]:
+    """
+    Solves the puzzles in a pool of worker processes, `chunksize` puzzles per task.
+    Results are yielded as soon as their chunk is done: in the input order when `ordered`,
+    otherwise in completion order (`index` is the position of the puzzle in the input).
+    Only a few chunks per worker are in flight, so `puzzles` can be an arbitrarily long stream.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize, initargs=(solver,)) as executor:
+        yield from map_chunks(executor, _solve_chunk, enumerate(puzzles), chunksize, 2 * workers, ordered)
+
+
+def map_chunks(executor: Executor, function: Callable[[List[T]], List[R]], items: Iterable[T], chunksize: int,
+               window: int, ordered: bool = True) -> Iterator[R]:
+    """
+    Submits `function` on chunks of `chunksize` items, with at most `window` chunks in flight, and yields the
+    results of each chunk as soon as it is done: in the order of the items when `ordered`, otherwise in
+    completion order. The items are only read when there is room in the window.
+    """
+    iterator = iter(items)
+    pending: Deque[Future[List[R]]] = deque()
+    running: Set[Future[List[R]]] = set()
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) + len(running) < window:
+            chunk = list(islice(iterator, chunksize))
+            if not chunk:
+                exhausted = True
+                break
+            future = executor.submit(function, chunk)
+            if ordered:
+                pending.append(future)
+            else:
+                running.add(future)
+
+        if ordered:
+            if not pending:
+                return
+            yield from pending.popleft().result()
+        else:
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def solve_stream(input: TextIO, output: TextIO, input_format: str = 'lines', solver: str = 'dlx',
+                 workers: Optional[int] = None, chunksize: int = 64) -> None:
+    """
+    Reads puzzles from `input` and writes one line per puzzle to `output`, in the same order.
+    Solved puzzles are written as their solution, unsolvable ones as they were read.
+    Memory use does not depend on the number of puzzles; lines are written as soon as their chunk is solved.
+    """
+    io = IO()
+    puzzles = io.read_lines(input) if input_format == 'lines' else io.read_sud(input)
+    pending: Deque[Grid] = deque()
+
+    def remember(stream: Iterator[Grid]) -> Iterator[Grid]:
+        for value in stream:
+            pending.append(value)
+            yield value
+
+    for result in solve_batch(remember(puzzles), solver=solver, workers=workers, chunksize=chunksize):
+        value = pending.popleft()
+        solution = result['solution']
+        io.write_line(value if solution is None else [list(row) for row in solution], output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve a stream of puzzles, one solution per line')
+    parser.add_argument('--format', choices=['lines', 'sud'], default='lines')
+    parser.add_argument('--solver', default='dlx')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=64)
+    arguments = parser.parse_args()
+    solve_stream(sys.stdin, sys.stdout, arguments.format, arguments.solver, arguments.workers, arguments.chunksize)
@@ -0,0 +1,77 @@
+import io
+import unittest
+from typing import List
+
+from batch import solve_batch, solve_stream
+from project_io import IO
+from solvers import Grid
+from sudoku import Sudoku
+
+
+class TestBatch(unittest.TestCase):
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+    easy = [
+        "  3 2 6  ",
+        "9  3 5  1",
+        "  18 64  ",
+        "  81 29  ",
+        "7       8",
+        "  67 82  ",
+        "  26 95  ",
+        "8  2 3  9",
+        "  5 1 3  ",
+    ]
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+    impossible = [
+        "36..712..",
+        ".5....18.",
+        "..92.47..",
+        "....13.28",
+        "4..1.2..9",
+        "27.46....",
+        "..53.89..",
+        ".83....6.",
+        "..769..43"
+    ]
+
+    def puzzles(self) -> List[Grid]:
+        io = IO()
+        return [io.load_generic(self.easy if i % 3 else self.impossible) for i in range(10)]
+
+    def test_ordered_results(self) -> None:
+        results = list(solve_batch(self.puzzles(), workers=2, chunksize=3))
+
+        self.assertEqual(list(range(10)), [result['index'] for result in results])
+        for result in results:
+            if result['index'] % 3:
+                self.assertEqual('solved', result['status'])
+                assert result['solution'] is not None
+                sudoku = Sudoku([list(row) for row in result['solution']])
+                self.assertTrue(sudoku.is_correct())
+                self.assertTrue(sudoku.is_complete())
+            else:
+                self.assertEqual('unsolvable', result['status'])
+            self.assertIn('seconds', result['stats'])
+
+    def test_unordered_results(self) -> None:
+        results = list(solve_batch(self.puzzles(), solver='backtracking', workers=2, chunksize=2, ordered=False))
+
+        self.assertEqual(list(range(10)), sorted(result['index'] for result in results))
+        self.assertEqual(['unsolvable'] * 4, [result['status'] for result in results if result['index'] % 3 == 0])
+
+    def test_solve_stream(self) -> None:
+        puzzles = io.StringIO("".join(IO.serialize_line(value) + "\n" for value in self.puzzles()[:4]))
+        output = io.StringIO()
+
+        solve_stream(puzzles, output, workers=2, chunksize=1)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(IO.serialize_line(IO().load_generic(self.impossible)), lines[0])
+        self.assertEqual("483921657967345821251876493548132976729564138136798245372689514814253769695417382",
+                         lines[1])
+        self.assertEqual(lines[1], lines[2])
+        self.assertEqual(lines[0], lines[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from statistics import mean, stdev
+from typing import Dict, Iterable, List, Optional, TypedDict
+
+from project_io import IO
+from solvers import SOLVERS, Grid, get_solver
+
+PERCENTILES = [50, 90, 99]
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+
+# One puzzle per line, as read by IO.read_lines
+CORPORA: Dict[str, List[str]] = {
+    'easy': [
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+        "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy2.sud
+        "2...8.3...6..7..84.3.5..2.9...1.54.8.........4.27.6...3.1..7.4.72..4..6...4.1...3",
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+        ".....3.17.15..9..8.6.......1....7.....9...2.....5....4.......2.5..6..34.34.2.....",
+    ],
+    'hard': [
+        # Source: https://norvig.com/top95.txt
+        "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+        "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+        "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+        "48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....",
+    ],
+    'adversarial': [
+        # Arto Inkala's puzzle, https://www.conceptispuzzles.com/index.aspx?uri=info/article/424
+        "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+        # Against brute force, https://en.wikipedia.org/wiki/Sudoku_solving_algorithms#Brute_force
+        "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+        "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    ],
+    'invalid': [
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+        "36..712...5....18...92.47......13.284..1.2..927.46......53.89...83....6...769..43",
+        "12345678.........9...............................................................",
+        # Source: https://norvig.com/sudoku.html (no solution, slow for a naive search)
+        ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4.........",
+    ],
+    'multi-solution': [
+        "." * 81,
+        # Source: https://norvig.com/sudoku.html
+        ".....6....59.....82....8....45........3........6..3.54...325..6..................",
+        # easy1 without its first row
+        ".........9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+    ],
+}
+
+Measurement = TypedDict('Measurement', {'runs': List[float], 'latencies': List[float]})
+Comparison = TypedDict('Comparison', {'baseline': Dict[str, float],
+                                      'current': Dict[str, float],
+                                      'change': float,
+                                      'significant': bool,
+                                      'regression': bool})
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * q / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summary(samples: List[float]) -> Dict[str, float]:
+    result = {f"p{q}": percentile(samples, q) for q in PERCENTILES}
+    result['mean'] = mean(samples)
+    result['max'] = max(samples)
+    return result
+
+
+def corpus(name: str) -> List[Grid]:
+    return list(IO().read_lines(CORPORA[name]))
+
+
+def compare_solvers(corpus: List[Grid], names: Optional[Iterable[str]] = None,
+                    repeat: int = 1) -> Dict[str, Dict[str, float]]:
+    """
+    Runs every solver (all the registered ones by default) on the same puzzles.
+    Returns, for each solver, the latency percentiles in seconds and how many puzzles it solved.
+    """
+    result: Dict[str, Dict[str, float]] = {}
+    for name in names if names is not None else SOLVERS:
+        solver = get_solver(name)
+        samples: List[float] = []
+        solved = 0
+        for value in corpus:
+            for _ in range(repeat):
+                solver_result = solver.solve(value)
+                samples.append(solver_result['stats']['seconds'])
+            solved += solver_result['status'] == 'solved'
+        result[name] = summary(samples)
+        result[name]['solved'] = solved
+    return result
+
+
+def print_comparison(comparison: Dict[str, Dict[str, float]]) -> None:
+    columns = [f"p{q}" for q in PERCENTILES] + ['mean', 'max']
+    print('{:15s} {:>7s} '.format('solver', 'solved') + " ".join('{:>10s}'.format(column) for column in columns))
+    for name, values in comparison.items():
+        print('{:15s} {:7d} '.format(name, int(values['solved'])) +
+              " ".join('{:10.6f}'.format(values[column]) for column in columns))
+
+
+def measure(puzzles: List[Grid], solver: str, repeat: int = 10) -> Measurement:
+    """
+    Solves the whole corpus `repeat` times.
+    `runs` has the time of each repetition (used for the statistical test), `latencies` the time of each puzzle.
+    """
+    instance = get_solver(solver)
+    result: Measurement = {'runs': [], 'latencies': []}
+    for _ in range(repeat):
+        latencies = [instance.solve(value)['stats']['seconds'] for value in puzzles]
+        result['runs'].append(sum(latencies))
+        result['latencies'].extend(latencies)
+    return result
+
+
+def compare(baseline: Measurement, current: Measurement) -> Comparison:
+    """
+    A change is significant when the mean of the current runs is three standard deviations (of the baseline runs)
+    away from the mean of the baseline runs. `change` is the improvement in percentage (negative when worse).
+    """
+    baseline_mean = mean(baseline['runs'])
+    current_mean = mean(current['runs'])
+    sigma = stdev(baseline['runs']) if len(baseline['runs']) > 1 else 0.0
+    return {'baseline': summary(baseline['latencies']),
+            'current': summary(current['latencies']),
+            'change': (1 - current_mean / baseline_mean) * 100,
+            'significant': abs(current_mean - baseline_mean) > 3 * sigma,
+            'regression': current_mean > baseline_mean + 3 * sigma}
+
+
+def machine_key() -> str:
+    return f"{platform.node()} {platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+
+
+def load_baselines(path: str = BASELINES_PATH) -> Dict[str, Dict[str, Measurement]]:
+    """Baselines by machine key, then by '<corpus>/<solver>'."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        result: Dict[str, Dict[str, Measurement]] = json.load(file)
+        return result
+
+
+def save_baselines(baselines: Dict[str, Dict[str, Measurement]], path: str = BASELINES_PATH) -> None:
+    with open(path, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+
+
+def print_measurement(name: str, current: Measurement, comparison: Optional[Comparison]) -> None:
+    latencies = summary(current['latencies'])
+    text = " ".join(f"{key}={value * 1000:.3f}ms" for key, value in latencies.items())
+    if comparison is None:
+        print(f"{name:30s} {text} (no baseline)")
+        return
+    verdict = 'regression' if comparison['regression'] else 'improvement' if comparison['significant'] else \
+        'not significant'
+    print(f"{name:30s} {text} {'improves' if comparison['change'] > 0 else 'is worse'} by "
+          f"{abs(round(comparison['change']))}% ({verdict})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the solvers against the baseline of this machine')
+    parser.add_argument('--corpus', action='append', choices=sorted(CORPORA), help='default: all of them')
+    parser.add_argument('--solver', action='append', help='default: all the registered ones')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('files', nargs='*', help='puzzle files (IO.read_lines format) to compare instead')
+    arguments = parser.parse_args(argv)
+
+    if arguments.files:
+        puzzles: List[Grid] = []
+        for path in arguments.files:
+            with open(path) as file:
+                puzzles.extend(IO().read_lines(file))
+        print_comparison(compare_solvers(puzzles, arguments.solver, arguments.repeat))
+        return 0
+
+    baselines = load_baselines(arguments.baselines)
+    machine = baselines.setdefault(machine_key(), {})
+    regressions = 0
+    for corpus_name in arguments.corpus or sorted(CORPORA):
+        puzzles = corpus(corpus_name)
+        for solver in arguments.solver or sorted(SOLVERS):
+            name = f"{corpus_name}/{solver}"
+            current = measure(puzzles, solver, arguments.repeat)
+            comparison = compare(machine[name], current) if name in machine else None
+            print_measurement(name, current, comparison)
+            regressions += comparison is not None and comparison['regression']
+            if arguments.update_baseline:
+                machine[name] = current
+
+    if arguments.update_baseline:
+        save_baselines(baselines, arguments.baselines)
+    if regressions:
+        print(f"{regressions} statistically significant regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
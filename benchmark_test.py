@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from benchmark import CORPORA, Measurement, compare, compare_solvers, corpus, load_baselines, machine_key, main, \
+    measure, percentile, save_baselines, summary
+from project_io import IO
+from solvers import get_solver
+from sudoku import Sudoku
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self) -> None:
+        samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+        self.assertEqual(1.0, percentile(samples, 0))
+        self.assertEqual(3.0, percentile(samples, 50))
+        self.assertEqual(4.5, percentile(samples, 87.5))
+        self.assertEqual(5.0, percentile(samples, 100))
+
+    def test_summary(self) -> None:
+        self.assertEqual({'p50': 2.0, 'p90': 2.0, 'p99': 2.0, 'mean': 2.0, 'max': 2.0}, summary([2.0]))
+
+    def test_compare_solvers(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+        raw_values = [
+            "  3 2 6  ",
+            "9  3 5  1",
+            "  18 64  ",
+            "  81 29  ",
+            "7       8",
+            "  67 82  ",
+            "  26 95  ",
+            "8  2 3  9",
+            "  5 1 3  ",
+        ]
+
+        comparison = compare_solvers([IO().load_generic(raw_values)], ['backtracking', 'dlx'], repeat=2)
+
+        self.assertEqual(['backtracking', 'dlx'], list(comparison))
+        for values in comparison.values():
+            self.assertEqual(1, values['solved'])
+            self.assertLessEqual(values['p50'], values['p99'])
+            self.assertLessEqual(values['p99'], values['max'])
+
+    def test_corpora_are_valid(self) -> None:
+        for name in CORPORA:
+            with self.subTest(corpus=name):
+                statuses = {result['status'] for result in (get_solver('dlx').solve(value) for value in corpus(name))}
+
+                self.assertEqual({'unsolvable'} if name == 'invalid' else {'solved'}, statuses)
+
+    def test_corpora_have_unique_solutions(self) -> None:
+        for name in ['easy', 'hard', 'adversarial', 'multi-solution']:
+            with self.subTest(corpus=name):
+                unique = {Sudoku([list(row) for row in value]).is_unique() for value in corpus(name)}
+
+                self.assertEqual({name != 'multi-solution'}, unique)
+
+    def test_compare_with_three_sigma(self) -> None:
+        baseline: Measurement = {'runs': [1.0, 1.1, 0.9, 1.0], 'latencies': [1.0, 1.1, 0.9, 1.0]}
+        for runs, significant, regression in [([1.05, 1.1], False, False),
+                                              ([2.0, 2.1], True, True),
+                                              ([0.5, 0.4], True, False)]:
+            with self.subTest(runs=runs):
+                comparison = compare(baseline, {'runs': runs, 'latencies': runs})
+
+                self.assertEqual(significant, comparison['significant'])
+                self.assertEqual(regression, comparison['regression'])
+        self.assertAlmostEqual(50.0, compare(baseline, {'runs': [0.5], 'latencies': [0.5]})['change'])
+        self.assertAlmostEqual(-100.0, compare(baseline, {'runs': [2.0], 'latencies': [2.0]})['change'])
+
+    def test_measure(self) -> None:
+        measurement = measure(corpus('easy'), 'dlx', repeat=2)
+
+        self.assertEqual(2, len(measurement['runs']))
+        self.assertEqual(2 * len(CORPORA['easy']), len(measurement['latencies']))
+        self.assertAlmostEqual(sum(measurement['latencies']), sum(measurement['runs']))
+
+    def test_baselines_roundtrip(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines.json')
+            self.assertEqual({}, load_baselines(path))
+            baselines = {machine_key(): {'easy/dlx': Measurement(runs=[1.0], latencies=[0.5, 0.5])}}
+
+            save_baselines(baselines, path)
+
+            self.assertEqual(baselines, load_baselines(path))
+
+    def test_main_fails_on_regression(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines.json')
+            arguments = ['--corpus', 'easy', '--solver', 'dlx', '--repeat', '2', '--baselines', path]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(0, main(arguments + ['--update-baseline']))
+                self.assertIn('easy/dlx', load_baselines(path)[machine_key()])
+
+                save_baselines({machine_key(): {'easy/dlx': Measurement(runs=[1e-9, 1e-9], latencies=[1e-9])}}, path)
+                self.assertEqual(1, main(arguments))
+
+                save_baselines({machine_key(): {'easy/dlx': Measurement(runs=[10.0, 10.0], latencies=[10.0])}}, path)
+                self.assertEqual(0, main(arguments))
+
+
+if __name__ == '__main__':
+    unittest.main()
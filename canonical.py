@@ -0,0 +1,248 @@
+import shelve
+import time
+from collections import OrderedDict
+from itertools import groupby, islice, permutations, product
+from math import factorial, prod
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from project_io import IO
+from solvers import Grid, SolverResult, get_solver
+from sudoku import SIZE
+
+BOX: int = 3
+# row and column orders tried for each orientation when the signatures leave ties (only exceeded by nearly
+# uniform grids, such as the empty one or complete ones, whose canonical form is then not guaranteed)
+MAX_ARRANGEMENTS: int = 64
+
+LineKey = Tuple[Tuple[int, ...], ...]
+# cells, transposed cells, keys of the rows, keys of the columns
+Signature = Tuple[List[int], List[int], List[LineKey], List[LineKey]]
+
+
+class Transform:
+    """
+    A symmetry of the sudoku: an optional transposition, then the rows and the columns in the given order
+    (output position -> source position), then the digits relabeled (source digit -> output digit).
+    """
+
+    def __init__(self, transpose: bool, rows: Sequence[int], columns: Sequence[int], digits: Sequence[int]):
+        assert sorted(rows) == list(range(SIZE)) and sorted(columns) == list(range(SIZE))
+        assert len(digits) == SIZE + 1 and digits[0] == 0 and sorted(digits) == list(range(SIZE + 1))
+        self.transpose = transpose
+        self.rows = tuple(rows)
+        self.columns = tuple(columns)
+        self.digits = tuple(digits)
+
+    def apply(self, value: Grid) -> Grid:
+        source = [list(row) for row in zip(*value)] if self.transpose else value
+        digits = self.digits
+        return [[None if source[row][column] is None else digits[source[row][column] or 0]
+                 for column in self.columns] for row in self.rows]
+
+    def inverse(self) -> 'Transform':
+        rows = _inverse(self.rows)
+        columns = _inverse(self.columns)
+        digits = _inverse(self.digits)
+        # undoing a transposition swaps the roles of the rows and the columns
+        return Transform(self.transpose, columns, rows, digits) if self.transpose else \
+            Transform(False, rows, columns, digits)
+
+
+def _inverse(order: Sequence[int]) -> List[int]:
+    result = [0] * len(order)
+    for position, source in enumerate(order):
+        result[source] = position
+    return result
+
+
+def _line_keys(cells: List[int], frequency: List[int]) -> List[LineKey]:
+    # invariant of each row under column permutations and relabeling: how often the digits of every
+    # segment of the row appear in the whole grid
+    return [tuple(sorted(tuple(sorted(frequency[cells[row * SIZE + column]]
+                                      for column in range(stack * BOX, stack * BOX + BOX)
+                                      if cells[row * SIZE + column]))
+                         for stack in range(BOX)))
+            for row in range(SIZE)]
+
+
+def _arrangements(items: Sequence[int], key: Callable[[int], Any]) -> List[Tuple[int, ...]]:
+    # the items sorted by key, in every order of the items with equal keys
+    result: List[Tuple[int, ...]] = [()]
+    for _, group in groupby(sorted(items, key=key), key=key):
+        tied = list(permutations(group))
+        result = [order + permutation for order in result for permutation in tied]
+    return result
+
+
+def _orders(keys: List[LineKey]) -> List[Tuple[int, ...]]:
+    """Line orders with the bands sorted by the keys of their lines, and the lines of each band by their keys."""
+    band_keys = [sorted(keys[band * BOX:band * BOX + BOX]) for band in range(BOX)]
+    result: List[Tuple[int, ...]] = []
+    for bands in _arrangements(range(BOX), band_keys.__getitem__):
+        for lines in product(*(_arrangements(range(band * BOX, band * BOX + BOX), keys.__getitem__)
+                               for band in bands)):
+            result.append(sum(lines, ()))
+    return result
+
+
+def _order_count(keys: List[LineKey]) -> int:
+    # len(_orders(keys)), without listing them: the orders of the tied bands, times those of the tied lines
+    band_keys = [sorted(keys[band * BOX:band * BOX + BOX]) for band in range(BOX)]
+    tied = [len(list(group)) for _, group in groupby(sorted(band_keys))]
+    tied += [len(list(group)) for lines in band_keys for _, group in groupby(lines)]
+    return prod(factorial(count) for count in tied)
+
+
+def _relabeled(cells: List[int], order: List[int], best: Optional[List[int]]) -> Optional[List[int]]:
+    # cells in that order, digits numbered by first appearance; None as soon as it cannot beat best
+    digits = [0] * (SIZE + 1)
+    label = 1
+    result: List[int] = []
+    smaller = best is None
+    for position, index in enumerate(order):
+        digit = cells[index]
+        if digit and not digits[digit]:
+            digits[digit] = label
+            label += 1
+        relabeled = digits[digit]
+        if not smaller:
+            assert best is not None
+            if relabeled > best[position]:
+                return None
+            smaller = relabeled < best[position]
+        result.append(relabeled)
+    return result if smaller else None
+
+
+def _signature(value: Grid) -> Signature:
+    cells = [cell or 0 for row in value for cell in row]
+    transposed = [cells[column * SIZE + row] for row in range(SIZE) for column in range(SIZE)]
+    frequency = [0] * (SIZE + 1)
+    for cell in cells:
+        frequency[cell] += 1
+    return cells, transposed, _line_keys(cells, frequency), _line_keys(transposed, frequency)
+
+
+def _arrangement_count(signature: Signature) -> int:
+    # row and column orders to compare for each orientation: 1 or 2 for most puzzles
+    return _order_count(signature[2]) * _order_count(signature[3])
+
+
+def canonical_form(value: Grid, limit: int = MAX_ARRANGEMENTS) -> Tuple[str, Transform]:
+    """
+    Smallest line (as written by IO.serialize_line, with '.' before the digits) among the relabelings,
+    row and column permutations within bands and stacks, band and stack permutations and transposition of
+    the grid, together with the transform that yields it. Equivalent puzzles have the same canonical form.
+    Only the orders of rows and columns with matching invariants are compared (at most `limit` of them for each
+    orientation), so this is fast for puzzles.
+    """
+    return _canonical_form(_signature(value), limit)
+
+
+def _canonical_form(signature: Signature, limit: int) -> Tuple[str, Transform]:
+    cells, transposed, row_keys, column_keys = signature
+    best: Optional[List[int]] = None
+    best_arrangement: Tuple[bool, Tuple[int, ...], Tuple[int, ...]] = (False, tuple(range(SIZE)), tuple(range(SIZE)))
+    for transpose, grid, keys in ((False, cells, (row_keys, column_keys)), (True, transposed, (column_keys, row_keys))):
+        for rows, columns in islice(product(_orders(keys[0]), _orders(keys[1])), limit):
+            candidate = _relabeled(grid, [row * SIZE + column for row in rows for column in columns], best)
+            if candidate is not None:
+                best = candidate
+                best_arrangement = (transpose, rows, columns)
+
+    transpose, rows, columns = best_arrangement
+    grid = transposed if transpose else cells
+    digits = [0] * (SIZE + 1)
+    label = 1
+    for row in rows:
+        for column in columns:
+            digit = grid[row * SIZE + column]
+            if digit and not digits[digit]:
+                digits[digit] = label
+                label += 1
+    # the digits missing from the puzzle take the remaining labels
+    for digit in range(1, SIZE + 1):
+        if not digits[digit]:
+            digits[digit] = label
+            label += 1
+    assert best is not None
+    return "".join(str(digit) if digit else '.' for digit in best), Transform(transpose, rows, columns, digits)
+
+
+class SolutionCache:
+    """
+    Bounded LRU of solutions keyed on the canonical form of the puzzles, so that a puzzle equivalent to one
+    already solved is answered by transforming the stored solution. With a path, the entries are also kept
+    in a shelve file that outlives the process, bounded the same way: it is read back when opened (in no
+    particular order of use), and the entries evicted from the LRU are deleted from it.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: Optional[str] = None, solver: str = 'dlx'):
+        self.maxsize = maxsize
+        self.solver = get_solver(solver)
+        # canonical form -> solution of the canonical form (as a line), None when unsolvable
+        self._entries: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self._shelf: Optional['shelve.Shelf[Optional[str]]'] = shelve.open(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+        # puzzles solved without the cache, because they have too many arrangements to compare
+        self.bypassed = 0
+        if self._shelf is not None:
+            for key in list(self._shelf):
+                self._remember(key, self._shelf[key])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> 'SolutionCache':
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._shelf is not None:
+            self._shelf.close()
+            self._shelf = None
+
+    def solve(self, value: Grid) -> SolverResult:
+        start = time.perf_counter()
+        signature = _signature(value)
+        if _arrangement_count(signature) > MAX_ARRANGEMENTS:
+            # nearly uniform grids take longer to put in canonical form than to solve
+            self.bypassed += 1
+            result = self.solver.solve(value)
+            return {'solution': result['solution'], 'status': result['status'],
+                    'stats': {'seconds': time.perf_counter() - start, 'cached': 0.0}}
+        key, transform = _canonical_form(signature, MAX_ARRANGEMENTS)
+        cached = True
+        if key in self._entries:
+            solution = self._entries[key]
+        else:
+            cached = False
+            result = self.solver.solve(transform.apply(value))
+            solution = IO.serialize_line([list(row) for row in result['solution']]) \
+                if result['solution'] is not None else None
+            if self._shelf is not None:
+                self._shelf[key] = solution
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._remember(key, solution)
+
+        original: Optional[List[List[int]]] = None
+        if solution is not None:
+            grid = transform.inverse().apply(next(IO().read_lines([solution])))
+            original = [[cell or 0 for cell in row] for row in grid]
+        return {'solution': original,
+                'status': 'solved' if original is not None else 'unsolvable',
+                'stats': {'seconds': time.perf_counter() - start, 'cached': float(cached)}}
+
+    def _remember(self, key: str, solution: Optional[str]) -> None:
+        self._entries[key] = solution
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            if self._shelf is not None:
+                del self._shelf[evicted]
@@ -0,0 +1,139 @@
+import os
+import random
+import shelve
+import tempfile
+import unittest
+from typing import List, Optional
+
+from benchmark import corpus
+from canonical import SolutionCache, Transform, canonical_form
+from project_io import IO
+from solvers import Grid
+from sudoku import Sudoku
+
+
+def random_transform(random_: random.Random) -> Transform:
+    def order() -> List[int]:
+        return [band * 3 + row for band in random_.sample(range(3), 3) for row in random_.sample(range(3), 3)]
+
+    digits = random_.sample(range(1, 10), 9)
+    return Transform(random_.random() < 0.5, order(), order(), [0] + digits)
+
+
+class TestCanonical(unittest.TestCase):
+    def test_transform_inverse(self) -> None:
+        random_ = random.Random(1)
+        for value in corpus('hard'):
+            transform = random_transform(random_)
+
+            self.assertEqual(value, transform.inverse().apply(transform.apply(value)))
+
+    def test_equivalent_puzzles_have_the_same_canonical_form(self) -> None:
+        random_ = random.Random(2)
+        for name in ['easy', 'hard', 'adversarial']:
+            for value in corpus(name):
+                with self.subTest(corpus=name):
+                    key, transform = canonical_form(value)
+
+                    self.assertEqual(key, IO.serialize_line(transform.apply(value)))
+                    for _ in range(5):
+                        self.assertEqual(key, canonical_form(random_transform(random_).apply(value))[0])
+
+    def test_different_puzzles_have_different_canonical_forms(self) -> None:
+        keys = {canonical_form(value)[0] for value in corpus('hard')}
+
+        self.assertEqual(len(corpus('hard')), len(keys))
+
+
+class TestSolutionCache(unittest.TestCase):
+    def assertSolves(self, value: Grid, solution: Optional[List[List[int]]]) -> None:
+        assert solution is not None
+        sudoku = Sudoku([list(row) for row in solution])
+        self.assertTrue(sudoku.is_correct() and sudoku.is_complete())
+        for row, solution_row in zip(value, solution):
+            for cell, solution_cell in zip(row, solution_row):
+                self.assertIn(cell, (None, solution_cell))
+
+    def test_equivalent_puzzle_is_a_hit(self) -> None:
+        value = corpus('adversarial')[0]
+        other = random_transform(random.Random(3)).apply(value)
+        cache = SolutionCache()
+
+        first = cache.solve(value)
+        second = cache.solve(other)
+
+        self.assertEqual(0.0, first['stats']['cached'])
+        self.assertEqual(1.0, second['stats']['cached'])
+        self.assertSolves(value, first['solution'])
+        self.assertSolves(other, second['solution'])
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_unsolvable_is_cached(self) -> None:
+        cache = SolutionCache()
+        value = corpus('invalid')[0]
+
+        cache.solve(value)
+        result = cache.solve(value)
+
+        self.assertEqual('unsolvable', result['status'])
+        self.assertEqual(1.0, result['stats']['cached'])
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = SolutionCache(maxsize=2)
+        first, second, third = corpus('hard')[:3]
+
+        cache.solve(first)
+        cache.solve(second)
+        cache.solve(first)
+        cache.solve(third)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1.0, cache.solve(first)['stats']['cached'])
+        self.assertEqual(0.0, cache.solve(second)['stats']['cached'])
+
+    def test_nearly_uniform_grid_is_not_cached(self) -> None:
+        cache = SolutionCache()
+        value: Grid = [[None] * 9 for _ in range(9)]
+
+        result = cache.solve(value)
+
+        self.assertEqual(0.0, result['stats']['cached'])
+        self.assertSolves(value, result['solution'])
+        self.assertEqual((1, 0, 0, 0), (cache.bypassed, cache.hits, cache.misses, len(cache)))
+        cache.solve(corpus('easy')[0])
+        self.assertEqual((1, 0, 1, 1), (cache.bypassed, cache.hits, cache.misses, len(cache)))
+
+    def test_disk_backed(self) -> None:
+        value = corpus('easy')[0]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'solutions')
+            with SolutionCache(path=path) as cache:
+                cache.solve(value)
+
+            with SolutionCache(path=path) as cache:
+                result = cache.solve(value)
+
+        self.assertEqual(1.0, result['stats']['cached'])
+        self.assertSolves(value, result['solution'])
+
+    def test_disk_backed_is_bounded(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'solutions')
+            with SolutionCache(maxsize=2, path=path) as cache:
+                for value in corpus('hard')[:3]:
+                    cache.solve(value)
+
+            with SolutionCache(maxsize=2, path=path) as cache:
+                self.assertEqual(2, len(cache))
+                self.assertEqual(1.0, cache.solve(corpus('hard')[2])['stats']['cached'])
+                self.assertEqual(0.0, cache.solve(corpus('hard')[0])['stats']['cached'])
+
+            with SolutionCache(maxsize=1, path=path) as cache:
+                self.assertEqual(1, len(cache))
+
+            with shelve.open(path) as shelf:
+                self.assertEqual(1, len(shelf))
+
+
+if __name__ == '__main__':
+    unittest.main()
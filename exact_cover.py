@@ -1,9 +1,12 @@
 import copy
 from functools import reduce
 from operator import and_
-from typing import TypedDict, Set, List, Optional
+from typing import TypedDict, Set, List, Optional, Sequence, Generator, TypeVar
 
 SIZE: int = 9
+T = TypeVar('T')
+# generators of the solutions, to be closed when stopped early
+Solutions = Generator[T, None, None]
 Constraints = TypedDict('Constraints', {'some_in_column_and_row': Set[str],
                                         'number_in_row': Set[str],
                                         'number_in_column': List[str]})
@@ -200,3 +203,262 @@ class ExactCover:
             if min(group) == 0:
                 return False
         return True
+
+    def iter_solutions(self) -> Solutions[List[ChoiceRow]]:
+        """
+        Yields every exact cover of the rows of the choice matrix not deleted (as a solution matrix) as soon as it
+        is found by DancingLinks, instead of selecting rows one at a time. The instance is not changed.
+        """
+        rows = self._not_deleted(self.choice_matrix)
+        if not rows:
+            return
+        links = DancingLinks(sum(len(group) for group in rows[0]['constraints']))
+        for index, row in enumerate(rows):
+            links.add_row(index, [column for column, constraint in
+                                  enumerate(constraint for group in row['constraints'] for constraint in group)
+                                  if constraint])
+        for solution in links.iter_solutions():
+            yield [copy.deepcopy(rows[index]) for index in solution]
+
+
+def _first(solutions: Solutions[T]) -> Optional[T]:
+    # closing the generator undoes its changes to the matrix right away
+    try:
+        return next(solutions, None)
+    finally:
+        solutions.close()
+
+
+class DancingNode:
+    left: 'DancingNode'
+    right: 'DancingNode'
+    up: 'DancingNode'
+    down: 'DancingNode'
+    column: 'DancingColumn'
+
+    def __init__(self, row: int = -1):
+        self.left = self.right = self.up = self.down = self
+        self.row = row
+
+
+class DancingColumn(DancingNode):
+    def __init__(self, index: int):
+        super().__init__()
+        self.column = self
+        self.index = index
+        self.size = 0
+
+
+class DancingLinks:
+    """
+    Knuth's Algorithm X on a sparse matrix of doubly-linked nodes (Dancing Links).
+    Covering and uncovering are exact inverses, so the matrix can be reused after a search.
+    """
+
+    def __init__(self, number_of_columns: int):
+        self.header = DancingColumn(-1)
+        self.columns: list[DancingColumn] = []
+        for index in range(number_of_columns):
+            column = DancingColumn(index)
+            column.right = self.header
+            column.left = self.header.left
+            self.header.left.right = column
+            self.header.left = column
+            self.columns.append(column)
+        self.rows: dict[int, DancingNode] = {}
+        self.solution: list[int] = []
+
+    def add_row(self, row: int, columns: List[int]) -> None:
+        first: Optional[DancingNode] = None
+        for index in columns:
+            column = self.columns[index]
+            node = DancingNode(row)
+            node.column = column
+            node.down = column
+            node.up = column.up
+            column.up.down = node
+            column.up = node
+            column.size += 1
+            if first is None:
+                first = node
+            else:
+                node.right = first
+                node.left = first.left
+                first.left.right = node
+                first.left = node
+        assert first is not None
+        self.rows[row] = first
+
+    @staticmethod
+    def cover(column: DancingColumn) -> None:
+        column.right.left = column.left
+        column.left.right = column.right
+        row = column.down
+        while row is not column:
+            node = row.right
+            while node is not row:
+                node.down.up = node.up
+                node.up.down = node.down
+                node.column.size -= 1
+                node = node.right
+            row = row.down
+
+    @staticmethod
+    def uncover(column: DancingColumn) -> None:
+        row = column.up
+        while row is not column:
+            node = row.left
+            while node is not row:
+                node.column.size += 1
+                node.down.up = node
+                node.up.down = node
+                node = node.left
+            row = row.up
+        column.right.left = column
+        column.left.right = column
+
+    def select(self, row: int) -> None:
+        node = self.rows[row]
+        self.solution.append(row)
+        self.cover(node.column)
+        other = node.right
+        while other is not node:
+            self.cover(other.column)
+            other = other.right
+
+    def deselect(self, row: int) -> None:
+        node = self.rows[row]
+        other = node.left
+        while other is not node:
+            self.uncover(other.column)
+            other = other.left
+        self.uncover(node.column)
+        self.solution.pop()
+
+    def _smallest_column(self) -> DancingColumn:
+        smallest = self.header.right.column
+        column = smallest.right.column
+        while column is not self.header and smallest.size > 0:
+            if column.size < smallest.size:
+                smallest = column
+            column = column.right.column
+        return smallest
+
+    def search(self) -> bool:
+        """
+        Extends self.solution with rows covering every remaining column.
+        Returns whether such a cover exists; the matrix is left as it was before the call.
+        """
+        solution = _first(self.iter_solutions())
+        if solution is None:
+            return False
+        self.solution[:] = solution
+        return True
+
+    def iter_solutions(self) -> Solutions[List[int]]:
+        """
+        Yields self.solution extended with the rows of each cover of the remaining columns, as soon as it is found.
+        The search is suspended in between. Once exhausted or closed, the matrix and self.solution are left as they
+        were before the call; until then, the matrix is in use.
+        """
+        if self.header.right is self.header:
+            yield list(self.solution)
+            return
+        column = self._smallest_column()
+        self.cover(column)
+        try:
+            row = column.down
+            while row is not column:
+                self.solution.append(row.row)
+                node = row.right
+                while node is not row:
+                    self.cover(node.column)
+                    node = node.right
+                try:
+                    yield from self.iter_solutions()
+                finally:
+                    node = row.left
+                    while node is not row:
+                        self.uncover(node.column)
+                        node = node.left
+                    self.solution.pop()
+                row = row.down
+        finally:
+            self.uncover(column)
+
+
+class SudokuExactCover:
+    """
+    Sudoku as an exact cover problem: 729 choices (row, column, value) against 324 constraints
+    (a value in each cell, each value in each row, each value in each column, each value in each square).
+    The matrix is built once and can solve several sudokus.
+    """
+
+    def __init__(self) -> None:
+        self.links = DancingLinks(4 * SIZE * SIZE)
+        for row in range(SIZE):
+            for column in range(SIZE):
+                for value_0 in range(SIZE):
+                    self.links.add_row(self.choice_for(row, column, value_0),
+                                       self.constraints_for(row, column, value_0))
+
+    @staticmethod
+    def choice_for(row: int, column: int, value_0: int) -> int:
+        return (row * SIZE + column) * SIZE + value_0
+
+    @staticmethod
+    def constraints_for(row: int, column: int, value_0: int) -> List[int]:
+        square = (row // 3) * 3 + column // 3
+        return [row * SIZE + column,
+                SIZE * SIZE + row * SIZE + value_0,
+                2 * SIZE * SIZE + column * SIZE + value_0,
+                3 * SIZE * SIZE + square * SIZE + value_0]
+
+    def solve(self, value: List[List[Optional[int]]]) -> Optional[List[List[int]]]:
+        assert len(value) == SIZE
+        assert reduce(and_, [len(row) == SIZE for row in value])
+
+        return _first(self.iter_solutions(value))
+
+    def iter_solutions(self, value: List[List[Optional[int]]]) -> Solutions[List[List[int]]]:
+        """
+        Yields every solution as soon as it is found, suspending the search in between.
+        The matrix is in use (for no other sudoku) until the generator is exhausted or closed.
+        """
+        assert len(value) == SIZE
+        assert reduce(and_, [len(row) == SIZE for row in value])
+
+        for solution in self._iter_cells([cell or 0 for row in value for cell in row]):
+            yield [list(solution[row * SIZE:(row + 1) * SIZE]) for row in range(SIZE)]
+
+    def solve_packed(self, packed: Sequence[int]) -> Optional[bytes]:
+        """
+        Solves a puzzle packed as SIZE * SIZE values in row order, 0 for the empty cells (see project_io.PackedPuzzles).
+        Returns the solution packed in the same way.
+        """
+        assert len(packed) == SIZE * SIZE
+        return _first(self._iter_cells(packed))
+
+    def _iter_cells(self, cells: Sequence[int]) -> Solutions[bytes]:
+        given: list[int] = []
+        covered: set[int] = set()
+        try:
+            for index, value in enumerate(cells):
+                if not value:
+                    continue
+                constraints = self.constraints_for(index // SIZE, index % SIZE, value - 1)
+                if covered.intersection(constraints):
+                    return
+                covered.update(constraints)
+                choice = index * SIZE + value - 1
+                self.links.select(choice)
+                given.append(choice)
+
+            for choices in self.links.iter_solutions():
+                result = bytearray(SIZE * SIZE)
+                for choice in choices:
+                    result[choice // SIZE] = choice % SIZE + 1
+                yield bytes(result)
+        finally:
+            for choice in reversed(given):
+                self.links.deselect(choice)
@@ -1,8 +1,9 @@
 import unittest
 from typing import Union
 
-from exact_cover import ChoiceRow, ExactCover
+from exact_cover import ChoiceRow, ExactCover, DancingLinks, SudokuExactCover
 from project_io import IO
+from sudoku import Sudoku
 
 
 class TestExactCover(unittest.TestCase):
@@ -55,6 +56,139 @@ class TestExactCover(unittest.TestCase):
 
         self.assertTrue(exact_cover.is_complete())
 
+    def test_dancing_links_finds_exact_cover(self) -> None:
+        # Source: Knuth, Dancing Links, figure 3
+        links = DancingLinks(7)
+        links.add_row(0, [2, 4, 5])
+        links.add_row(1, [0, 3, 6])
+        links.add_row(2, [1, 2, 5])
+        links.add_row(3, [0, 3])
+        links.add_row(4, [1, 6])
+        links.add_row(5, [3, 4, 6])
+
+        self.assertTrue(links.search())
+        self.assertEqual([0, 3, 4], sorted(links.solution))
+        self.assertEqual([2, 2, 2, 3, 2, 2, 3], [column.size for column in links.columns])
+
+    def test_dancing_links_iterates_over_exact_covers(self) -> None:
+        links = DancingLinks(4)
+        links.add_row(0, [0, 1])
+        links.add_row(1, [2, 3])
+        links.add_row(2, [0, 2])
+        links.add_row(3, [1, 3])
+        links.add_row(4, [0, 1, 2, 3])
+
+        solutions = links.iter_solutions()
+
+        self.assertEqual([0, 1], sorted(next(solutions)))
+        solutions.close()
+        self.assertEqual([], links.solution)
+        self.assertEqual([3, 3, 3, 3], [column.size for column in links.columns])
+        self.assertEqual([[0, 1], [2, 3], [4]], sorted(sorted(solution) for solution in links.iter_solutions()))
+
+    def test_latin_square_2x2_solutions(self) -> None:
+        exact_cover = ExactCover(IO().load_generic(["  ", "  "]))
+
+        solutions = list(exact_cover.iter_solutions())
+
+        self.assertEqual(2, len(solutions))
+        for solution in solutions:
+            exact_cover.solution_matrix = solution
+            self.assertTrue(exact_cover.is_complete())
+        self.assertEqual([[1, 2, 2, 1], [2, 1, 1, 2]],
+                         sorted([row['choice'] for row in solution] for solution in solutions))
+
+    def test_dancing_links_without_exact_cover(self) -> None:
+        links = DancingLinks(3)
+        links.add_row(0, [0, 1])
+        links.add_row(1, [1, 2])
+
+        self.assertFalse(links.search())
+        self.assertEqual([], links.solution)
+
+    def test_solve_sudoku_with_ambiguity(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+        raw_values = [
+            ".....3.17",
+            ".15..9..8",
+            ".6.......",
+            "1....7...",
+            "..9...2..",
+            "...5....4",
+            ".......2.",
+            "5..6..34.",
+            "34.2....."
+        ]
+        value = IO().load_generic(raw_values)
+
+        solution = SudokuExactCover().solve(value)
+
+        assert solution is not None
+        sudoku = Sudoku([list(row) for row in solution])
+        self.assertTrue(sudoku.is_correct())
+        self.assertTrue(sudoku.is_complete())
+        for row in range(len(value)):
+            for column in range(len(value)):
+                if value[row][column] is not None:
+                    self.assertEqual(value[row][column], solution[row][column])
+
+    def test_solve_several_sudokus_with_the_same_matrix(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+        impossible = [
+            "36..712..",
+            ".5....18.",
+            "..92.47..",
+            "....13.28",
+            "4..1.2..9",
+            "27.46....",
+            "..53.89..",
+            ".83....6.",
+            "..769..43"
+        ]
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+        easy = [
+            "  3 2 6  ",
+            "9  3 5  1",
+            "  18 64  ",
+            "  81 29  ",
+            "7       8",
+            "  67 82  ",
+            "  26 95  ",
+            "8  2 3  9",
+            "  5 1 3  ",
+        ]
+        exact_cover = SudokuExactCover()
+
+        self.assertIsNone(exact_cover.solve(IO().load_generic(impossible)))
+        solution = exact_cover.solve(IO().load_generic(easy))
+
+        self.assertEqual([4, 8, 3, 9, 2, 1, 6, 5, 7], solution[0] if solution else None)
+        self.assertEqual([], exact_cover.links.solution)
+
+    def test_sudoku_solutions_one_at_a_time(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        raw_values = [
+            ".........",
+            "9..3.5..1",
+            "..18.64..",
+            "..81.29..",
+            "7.......8",
+            "..67.82..",
+            "..26.95..",
+            "8..2.3..9",
+            "..5.1.3.."
+        ]
+        value = IO().load_generic(raw_values)
+        exact_cover = SudokuExactCover()
+
+        solutions = exact_cover.iter_solutions(value)
+        first = next(solutions)
+        solutions.close()
+
+        self.assertEqual([], exact_cover.links.solution)
+        self.assertEqual(first, exact_cover.solve(value))
+        self.assertEqual(Sudoku(value).count_solutions(), len(list(exact_cover.iter_solutions(value))))
+
     def assert_no_repeated_constraints(self, exact_cover: ExactCover) -> None:
         totals = exact_cover.compute_solution_totals()
         for total in totals:
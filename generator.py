@@ -0,0 +1,152 @@
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import count
+from math import isqrt
+from typing import Iterator, List, Optional, Tuple, TypedDict, Union
+
+from batch import map_chunks
+from project_io import IO
+from solvers import Grid
+from sudoku import SearchStats, Sudoku
+
+Generated = TypedDict('Generated', {'index': int,
+                                    'puzzle': Grid,
+                                    'solution': List[List[int]],
+                                    'clues': int,
+                                    'guesses': int})
+# (clues, min_guesses, max_guesses, size, attempts)
+Options = Tuple[Optional[int], int, Optional[int], int, int]
+
+
+class _Grid(Sudoku):
+    """
+    A complete grid whose clues are removed one by one, as long as the solution stays unique.
+    The candidates are always the ones computed from the values, so that a removal (see Sudoku._erase) and its
+    uniqueness check only touch the trail instead of building the sudoku again.
+    """
+    __slots__ = ()
+
+    def __init__(self, solution: Grid):
+        super().__init__(solution)
+        assert self.is_complete() and self.is_correct()
+        self._compute_candidate()
+        self._clear_pending()
+
+    @property
+    def clues(self) -> int:
+        return self._occupied_cells()
+
+    def remove(self, index: int, deduced: bool) -> bool:
+        """
+        Empties the cell if the puzzle still has only its solution (and, if deduced, is solved by the deductions
+        alone, without guessing). Returns whether it did.
+        """
+        mark = len(self._trail)
+        value = self._cells[index]
+        self._erase(index)
+        bit = 1 << (value - 1)
+        # with its peers, the other clues leave only that value to the cell
+        unique = self._candidates[index] == bit
+        if not unique:
+            # any solution with another value in the cell is a second one: the first found is enough
+            search = len(self._trail)
+            self._eliminate(index, bit)
+            unique = not (self._deduce_all() and any(True for _ in self._solutions_r()))
+            self._undo(search)
+        if unique and deduced:
+            search = len(self._trail)
+            unique = self._deduce_all() and self.is_complete()
+            self._undo(search)
+        if not unique:
+            self._undo(mark)
+        # the singles queued by the removal may get more candidates with the next one
+        self._clear_pending()
+        return unique
+
+
+def random_grid(random_: random.Random, size: int = 9) -> Grid:
+    """A random complete grid: the squares of the diagonal shuffled, the rest filled by the solver."""
+    box = isqrt(size)
+    value: Grid = [[None] * size for _ in range(size)]
+    for square in range(box):
+        values = random_.sample(range(1, size + 1), size)
+        for i, cell in enumerate(values):
+            value[square * box + i // box][square * box + i % box] = cell
+    result = Sudoku(value).solve()
+    assert result['status'] == 'solved'
+    return result['value']
+
+
+def generate(seed: Union[int, str], clues: Optional[int] = None, min_guesses: int = 0,
+             max_guesses: Optional[int] = None, size: int = 9, attempts: int = 100) -> Generated:
+    """
+    A puzzle with a unique solution, the same for the same seed. The clues of a random grid are removed in a
+    random order until `clues` are left, or none can be removed. The difficulty is the number of guesses of the
+    backtracking search (see SearchStats): puzzles outside [min_guesses, max_guesses] are thrown away and
+    generated again, up to `attempts` times. With max_guesses=0, every removal keeps the puzzle solvable by
+    deductions alone.
+    """
+    random_ = random.Random(seed)
+    for _ in range(attempts):
+        solution = random_grid(random_, size)
+        grid = _Grid(solution)
+        order = list(range(size * size))
+        random_.shuffle(order)
+        for index in order:
+            if clues is not None and grid.clues <= clues:
+                break
+            grid.remove(index, max_guesses == 0)
+
+        puzzle = [list(row) for row in grid.value]
+        stats = SearchStats()
+        Sudoku(puzzle, stats).solve()
+        if min_guesses <= stats.guessed and (max_guesses is None or stats.guessed <= max_guesses):
+            return {'index': 0, 'puzzle': puzzle, 'solution': [[cell or 0 for cell in row] for row in solution],
+                    'clues': grid.clues, 'guesses': stats.guessed}
+    raise ValueError(f"No puzzle with {min_guesses} to {max_guesses} guesses in {attempts} attempts")
+
+
+def _generate_chunk(seed: int, options: Options, indexes: List[int]) -> List[Generated]:
+    results: List[Generated] = []
+    for index in indexes:
+        # seeded by position, so that the puzzles do not depend on the workers or the chunks
+        result = generate(f"{seed}:{index}", *options)
+        result['index'] = index
+        results.append(result)
+    return results
+
+
+def generate_batch(count_: Optional[int] = None, seed: int = 0, clues: Optional[int] = None, min_guesses: int = 0,
+                   max_guesses: Optional[int] = None, size: int = 9, attempts: int = 100,
+                   workers: Optional[int] = None, chunksize: int = 16) -> Iterator[Generated]:
+    """
+    Generates `count_` puzzles (endlessly when None) in a pool of worker processes, `chunksize` puzzles per task,
+    yielded in order as soon as their chunk is done. Puzzle `index` is the same for the same seed and options.
+    """
+    workers = workers or os.cpu_count() or 1
+    options: Options = (clues, min_guesses, max_guesses, size, attempts)
+    indexes = range(count_) if count_ is not None else count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from map_chunks(executor, partial(_generate_chunk, seed, options), indexes, chunksize, 2 * workers)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate puzzles with a unique solution, one per line')
+    parser.add_argument('--count', type=int, default=None, help='number of puzzles (default: until interrupted)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clues', type=int, default=None, help='clues to aim for (default: as few as possible)')
+    parser.add_argument('--min-guesses', type=int, default=0)
+    parser.add_argument('--max-guesses', type=int, default=None)
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=16)
+    arguments = parser.parse_args()
+    io = IO()
+    for generated in generate_batch(arguments.count, arguments.seed, arguments.clues, arguments.min_guesses,
+                                    arguments.max_guesses, arguments.size, workers=arguments.workers,
+                                    chunksize=arguments.chunksize):
+        io.write_line(generated['puzzle'], sys.stdout)
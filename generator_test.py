@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from generator import generate, generate_batch, random_grid
+from sudoku import SearchStats, Sudoku
+
+
+class TestGenerator(unittest.TestCase):
+    def test_random_grid(self) -> None:
+        grid = random_grid(random.Random(1))
+        sudoku = Sudoku(grid)
+
+        self.assertTrue(sudoku.is_complete() and sudoku.is_correct())
+        self.assertNotEqual(grid, random_grid(random.Random(2)))
+
+    def test_generated_puzzle_has_a_unique_solution(self) -> None:
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                generated = generate(seed)
+                sudoku = Sudoku(generated['puzzle'])
+
+                self.assertTrue(sudoku.is_unique())
+                sudoku.solve()
+                self.assertEqual(generated['solution'], [list(row) for row in sudoku.value])
+                self.assertEqual(generated['clues'], sum(cell is not None for row in generated['puzzle']
+                                                         for cell in row))
+
+    def test_same_seed_same_puzzle(self) -> None:
+        self.assertEqual(generate(3)['puzzle'], generate(3)['puzzle'])
+        self.assertNotEqual(generate(3)['puzzle'], generate(4)['puzzle'])
+
+    def test_target_clue_count(self) -> None:
+        generated = generate(5, clues=35)
+
+        self.assertEqual(35, generated['clues'])
+        self.assertTrue(Sudoku(generated['puzzle']).is_unique())
+
+    def test_target_difficulty(self) -> None:
+        easy = generate(6, max_guesses=0)
+        hard = generate(6, min_guesses=2)
+        stats = SearchStats()
+        Sudoku(easy['puzzle'], stats).solve()
+
+        self.assertEqual(0, stats.guessed)
+        self.assertGreaterEqual(hard['guesses'], 2)
+
+    def test_larger_grid(self) -> None:
+        generated = generate(7, clues=180, size=16)
+
+        self.assertEqual(180, generated['clues'])
+        self.assertTrue(Sudoku(generated['puzzle']).is_unique())
+
+    def test_batch_does_not_depend_on_the_workers(self) -> None:
+        batch = list(generate_batch(6, seed=8, clues=30, workers=2, chunksize=2))
+
+        self.assertEqual(list(range(6)), [generated['index'] for generated in batch])
+        self.assertEqual([generated['puzzle'] for generated in batch],
+                         [generated['puzzle'] for generated in generate_batch(6, seed=8, clues=30, workers=1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
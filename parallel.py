@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, List, Optional, Set, Tuple
+
+from solvers import Grid
+from sudoku import SearchBudget, SolveResult, Sudoku
+
+# (solutions found, one of them, subproblems left to explore because the budget ran out)
+Outcome = Tuple[int, Optional[bytes], List[bytes]]
+
+# state of each worker process, set once by _initialize
+_cancelled: Any = None
+_max_nodes: Optional[int] = None
+
+
+def _initialize(cancelled: Any, max_nodes: Optional[int]) -> None:
+    global _cancelled, _max_nodes
+    _cancelled = cancelled
+    _max_nodes = max_nodes
+
+
+def _explore(cells: bytes, limit: Optional[int]) -> Outcome:
+    """
+    Searches the subproblems of one subproblem in turn for up to `limit` solutions, within the node budget.
+    When the budget runs out, the subproblems not finished yet are returned to be explored by other tasks,
+    one level deeper each time.
+    """
+    budget = SearchBudget(_max_nodes, event=_cancelled)
+    subproblems = list(Sudoku.from_packed(cells).subproblems())
+    count = 0
+    for i, subproblem in enumerate(subproblems):
+        sudoku = Sudoku.from_packed(subproblem)
+        found = 0
+        if limit == 1:
+            result = sudoku.solve(budget=budget)
+            if result['status'] == 'solved':
+                return 1, bytes(cell or 0 for row in result['value'] for cell in row), []
+        else:
+            found = sudoku.count_solutions(None if limit is None else limit - count, budget)
+        if budget.exhausted:
+            # the solutions found in the unfinished subproblem are counted when it is explored again
+            return count, None, [] if _cancelled.is_set() else subproblems[i:]
+        count += found
+        if count == limit:
+            break
+    return count, None, []
+
+
+class ParallelSearch:
+    """
+    Searches a single puzzle in a pool of worker processes. The first levels of the search tree are split
+    into subproblems, and every task explores one of them with at most `max_nodes` nodes. The subproblems that
+    need more are split again by their worker, and their parts are given to the next idle workers (the deepest
+    first, so that a few tasks per worker are in flight). Once the answer is known, the tasks still running are
+    cancelled through a shared event.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_nodes: Optional[int] = 2000):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_nodes = max_nodes
+        context = multiprocessing.get_context()
+        self._cancelled = context.Event()
+        self._executor = ProcessPoolExecutor(self.workers, context, _initialize, (self._cancelled, max_nodes))
+
+    def __enter__(self) -> 'ParallelSearch':
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def solve(self, value: Grid) -> SolveResult:
+        """Like Sudoku.solve, without a budget: the status is 'solved' or 'unsolvable'."""
+        count, solution = self._search(value, 1)
+        cells = solution if solution is not None else bytes(cell or 0 for row in value for cell in row)
+        size = len(value)
+        return {'status': 'solved' if count else 'unsolvable',
+                'value': [[cells[row * size + column] or None for column in range(size)] for row in range(size)]}
+
+    def count_solutions(self, value: Grid, limit: Optional[int] = None) -> int:
+        """Like Sudoku.count_solutions: the counts of all the subproblems, up to `limit`."""
+        return self._search(value, limit)[0]
+
+    def _search(self, value: Grid, limit: Optional[int]) -> Tuple[int, Optional[bytes]]:
+        self._cancelled.clear()
+        count = 0
+        solution: Optional[bytes] = None
+        # subproblems waiting for a worker, the deepest last: they are taken depth first, like the search does
+        pending = self._split(Sudoku(value))[::-1]
+        running: Set[Future[Outcome]] = set()
+        try:
+            while (pending or running) and (limit is None or count < limit):
+                while pending and len(running) < 2 * self.workers:
+                    running.add(self._executor.submit(_explore, pending.pop(), limit))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, first, subproblems = future.result()
+                    count += found
+                    solution = solution or first
+                    pending.extend(reversed(subproblems))
+        finally:
+            if running:
+                self._cancelled.set()
+                for future in running:
+                    future.cancel()
+                wait(running)
+        return count if limit is None else min(count, limit), solution
+
+    def _split(self, sudoku: Sudoku) -> List[bytes]:
+        # breadth first, until there are a few subproblems per worker or they are all solved
+        subproblems = list(sudoku.subproblems())
+        for _ in range(sudoku.size):
+            if len(subproblems) >= 4 * self.workers:
+                break
+            split = [cells for parent in subproblems for cells in Sudoku.from_packed(parent).subproblems()]
+            if split == subproblems:
+                break
+            subproblems = split
+        return subproblems
@@ -0,0 +1,60 @@
+import unittest
+
+from benchmark import corpus
+from parallel import ParallelSearch
+from project_io import IO
+from sudoku import Sudoku
+
+
+class TestParallel(unittest.TestCase):
+    search: ParallelSearch
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # a tiny budget, so that the subproblems are split again and again
+        cls.search = ParallelSearch(workers=2, max_nodes=1)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.search.close()
+
+    def test_solve(self) -> None:
+        for value in corpus('adversarial'):
+            result = self.search.solve(value)
+
+            self.assertEqual('solved', result['status'])
+            sudoku = Sudoku(result['value'])
+            self.assertTrue(sudoku.is_complete() and sudoku.is_correct())
+            for row, solved_row in zip(value, result['value']):
+                for cell, solved_cell in zip(row, solved_row):
+                    self.assertIn(cell, (None, solved_cell))
+
+    def test_solve_impossible(self) -> None:
+        self.assertEqual('unsolvable', self.search.solve(corpus('invalid')[0])['status'])
+
+    def test_count_solutions(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        value = IO().load_generic([".........", "9..3.5..1", "..18.64..", "..81.29..", "7.......8", "..67.82..",
+                                   "..26.95..", "8..2.3..9", "..5.1.3.."])
+
+        self.assertEqual(37, self.search.count_solutions(value))
+        self.assertEqual(5, self.search.count_solutions(value, limit=5))
+        self.assertEqual(1, self.search.count_solutions(corpus('hard')[0]))
+
+    def test_count_with_budgets_running_out_inside_subproblems(self) -> None:
+        # a few nodes: the budget runs out after some of the solutions of a subproblem are found
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        value = IO().load_generic([".........", "9..3.5..1", "..18.64..", "..81.29..", "7.......8", "..67.82..",
+                                   "..26.95..", "8..2.3..9", "..5.1.3.."])
+
+        for max_nodes in (3, 10, 50):
+            with self.subTest(max_nodes=max_nodes), ParallelSearch(workers=2, max_nodes=max_nodes) as search:
+                self.assertEqual(37, search.count_solutions(value))
+                self.assertEqual(20, search.count_solutions(value, limit=20))
+
+    def test_count_stops_at_limit(self) -> None:
+        self.assertEqual(20, self.search.count_solutions(corpus('multi-solution')[0], limit=20))
+
+
+if __name__ == '__main__':
+    unittest.main()
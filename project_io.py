@@ -1,6 +1,14 @@
-from typing import List, Optional
+import mmap
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, TextIO
 
-from sudoku import Sudoku
+from math import isqrt
+
+from sudoku import DIGITS, Sudoku, SIZE
+
+# '1'..'9' -> 1..9, '.' and '0' -> 0 (empty), line endings unchanged, anything else -> INVALID
+INVALID: int = 0xFF
+_PACK_TABLE = bytes(int(chr(i)) if chr(i) in '123456789' else 0 if chr(i) in '.0' else i if chr(i) in '\r\n' else
+                    INVALID for i in range(256))
 
 
 class IO:
@@ -8,9 +16,123 @@ class IO:
         return Sudoku(self.load_generic(raw_values))
 
     def load_generic(self, raw_values: List[str]) -> List[List[Optional[int]]]:
-        return [list(map(lambda x: int(x) if x != ' ' and x != '.' else None, raw_value)) for raw_value in
-                raw_values]
+        # values above 9 are letters (see sudoku.DIGITS), in upper or lower case
+        return [list(map(lambda x: DIGITS.index(x.upper()) + 1 if x != ' ' and x != '.' and x != '0' else None,
+                         raw_value)) for raw_value in raw_values]
 
     def serialize(self, sudoku: Sudoku) -> List[str]:
-        return ["".join(map(lambda x: x.__str__() if x is not None else ' ', raw_value)) for raw_value in
+        return ["".join(map(lambda x: DIGITS[x - 1] if x is not None else ' ', raw_value)) for raw_value in
                 sudoku.value]
+
+    def read_lines(self, lines: Iterable[str]) -> Iterator[List[List[Optional[int]]]]:
+        """
+        One puzzle per line, 81 characters in row order, '.' or '0' for the empty cells.
+        16x16 and 25x25 puzzles take 256 and 625 characters, with letters for the values above 9.
+        Empty lines and lines starting with '#' are skipped.
+        """
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            size = isqrt(len(line))
+            assert size * size == len(line) and size in (SIZE, 16, 25), \
+                f"Expected {SIZE * SIZE}, 256 or 625 characters, found '{line}'"
+            value = self.load_generic([line[i:i + size] for i in range(0, size * size, size)])
+            assert all(cell is None or cell <= size for row in value for cell in row), \
+                f"Expected values up to {DIGITS[size - 1]}, found '{line}'"
+            yield value
+
+    def read_sud(self, lines: Iterable[str]) -> Iterator[List[List[Optional[int]]]]:
+        """
+        Puzzles in the .sud format: nine rows per puzzle, separated by empty lines.
+        Rows shorter than nine characters (trailing spaces trimmed) are padded with empty cells, so an empty line
+        inside a puzzle is a row without values.
+        """
+        rows: List[str] = []
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line and not rows:
+                continue
+            rows.append(line.ljust(SIZE))
+            if len(rows) == SIZE:
+                yield self.load_generic(rows)
+                rows = []
+        assert not rows, f"Incomplete puzzle: {rows}"
+
+    @staticmethod
+    def serialize_line(value: Sequence[Sequence[Optional[int]]]) -> str:
+        return "".join(DIGITS[cell - 1] if cell is not None else '.' for row in value for cell in row)
+
+    def write_line(self, value: List[List[Optional[int]]], output: TextIO) -> None:
+        output.write(self.serialize_line(value) + '\n')
+        output.flush()
+
+    def write_sud(self, value: List[List[Optional[int]]], output: TextIO) -> None:
+        for row in value:
+            output.write("".join(DIGITS[cell - 1] if cell is not None else '.' for cell in row) + '\n')
+        output.write('\n')
+        output.flush()
+
+
+class PackedPuzzles:
+    """
+    Puzzles packed as SIZE * SIZE bytes each, in row order, with 0 for the empty cells.
+    The records keep the width of the file they were decoded from, so every puzzle is a view into one buffer.
+    """
+
+    def __init__(self, data: bytearray, width: int):
+        self.data = data
+        self.width = width
+
+    @classmethod
+    def load(cls, path: str, block_records: int = 65536) -> 'PackedPuzzles':
+        """
+        Memory-maps a fixed-width file of one puzzle per line (as read by IO.read_lines, without comments)
+        and decodes it block by block into a single buffer of the same size.
+        """
+        with open(path, 'rb') as file:
+            if not file.seek(0, 2):
+                return cls(bytearray(), SIZE * SIZE + 1)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                width = mapped.find(b'\n') + 1 or len(mapped) + 1
+                assert width - 1 in (SIZE * SIZE, SIZE * SIZE + 1), f"Expected {SIZE * SIZE} characters per line"
+                # the last line may not end with its line ending ('\n' or '\r\n')
+                missing = -len(mapped) % width
+                assert missing <= width - SIZE * SIZE, "Expected lines of the same width"
+                size = len(mapped) + missing
+
+                data = bytearray(size)
+                block = block_records * width
+                for start in range(0, size, block):
+                    decoded = mapped[start:start + block].translate(_PACK_TABLE)
+                    data[start:start + len(decoded)] = decoded
+                    assert INVALID not in decoded, f"Invalid character after puzzle {start // width}"
+                data[len(mapped):] = b'\r\n'[2 - missing:]
+                # the table keeps the line endings: they must be at the end of the lines, and only there
+                lines = size // width
+                assert data[width - 1::width] == b'\n' * lines and data.count(b'\n') == lines, \
+                    "Expected lines of the same width"
+                crlf = width == SIZE * SIZE + 2
+                assert data.count(b'\r') == (lines if crlf else 0) and \
+                    (not crlf or data[SIZE * SIZE::width] == b'\r' * lines), \
+                    f"Expected {SIZE * SIZE} characters per line"
+        return cls(data, width)
+
+    def __len__(self) -> int:
+        return len(self.data) // self.width
+
+    def __getitem__(self, index: int) -> memoryview:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start = index * self.width
+        return memoryview(self.data)[start:start + SIZE * SIZE]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def as_numpy(self) -> Any:
+        """(N, SIZE * SIZE) uint8 view of the same buffer. Requires numpy."""
+        import numpy
+
+        return numpy.frombuffer(self.data, dtype=numpy.uint8).reshape(len(self), self.width)[:, :SIZE * SIZE]
@@ -0,0 +1,159 @@
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+from exact_cover import SudokuExactCover
+from project_io import IO, PackedPuzzles
+from sudoku import Sudoku
+
+
+class TestIO(unittest.TestCase):
+    def test_read_lines(self) -> None:
+        lines = io.StringIO(
+            "# Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud\n"
+            ".....3.17.15..9..8.6.......1....7.....9...2.....5....4.......2.5..6..34.34.2.....\n"
+            "\n"
+            "000003017015009008060000000100007000009000200000500004000000020500600340340200000\n")
+
+        puzzles = list(IO().read_lines(lines))
+
+        self.assertEqual(2, len(puzzles))
+        self.assertEqual(puzzles[0], puzzles[1])
+        self.assertEqual([None, None, None, None, None, 3, None, 1, 7], puzzles[0][0])
+        self.assertEqual([3, 4, None, 2, None, None, None, None, None], puzzles[0][8])
+
+    def test_read_lines_of_larger_grids(self) -> None:
+        rows = ["".join("123456789ABCDEFG"[(4 * (row % 4) + row // 4 + column) % 16] for column in range(16))
+                for row in range(16)]
+        line = "".join(rows).replace('G', '.')
+
+        puzzle = next(IO().read_lines([line.lower()]))
+
+        self.assertEqual(16, len(puzzle))
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, None], puzzle[0])
+        self.assertEqual(line, IO.serialize_line(puzzle))
+        with self.assertRaises(AssertionError):
+            next(IO().read_lines([line[:81]]))
+
+    def test_read_sud(self) -> None:
+        lines = io.StringIO(
+            "  3 2 6\n"
+            "9  3 5  1\n"
+            "  18 64\n"
+            "  81 29\n"
+            "7       8\n"
+            "  67 82\n"
+            "  26 95\n"
+            "8  2 3  9\n"
+            "  5 1 3\n"
+            "\n" +
+            "123456789\n" * 9)
+
+        puzzles = list(IO().read_sud(lines))
+
+        self.assertEqual(2, len(puzzles))
+        self.assertEqual([None, None, 3, None, 2, None, 6, None, None], puzzles[0][0])
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 9], puzzles[1][8])
+
+    def test_read_sud_with_blank_rows(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its fifth and last rows
+        lines = io.StringIO(
+            "  3 2 6\n"
+            "9  3 5  1\n"
+            "  18 64\n"
+            "  81 29\n"
+            "\n"
+            "  67 82\n"
+            "  26 95\n"
+            "8  2 3  9\n"
+            "\n"
+            "\n" +
+            "123456789\n" * 9)
+
+        puzzles = list(IO().read_sud(lines))
+
+        self.assertEqual(2, len(puzzles))
+        self.assertEqual([None] * 9, puzzles[0][4])
+        self.assertEqual([None, None, 6, 7, None, 8, 2, None, None], puzzles[0][5])
+        self.assertEqual([None] * 9, puzzles[0][8])
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 9], puzzles[1][0])
+
+    def test_read_sud_with_incomplete_puzzle(self) -> None:
+        with self.assertRaises(AssertionError):
+            list(IO().read_sud(io.StringIO("123456789\n" * 8)))
+
+    def test_write_roundtrip(self) -> None:
+        line = ".....3.17.15..9..8.6.......1....7.....9...2.....5....4.......2.5..6..34.34.2....."
+        value = next(IO().read_lines([line]))
+        lines_output = io.StringIO()
+        sud_output = io.StringIO()
+
+        IO().write_line(value, lines_output)
+        IO().write_sud(value, sud_output)
+
+        self.assertEqual(line + "\n", lines_output.getvalue())
+        self.assertEqual([value], list(IO().read_sud(io.StringIO(sud_output.getvalue()))))
+
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+    ambiguous = ".....3.17.15..9..8.6.......1....7.....9...2.....5....4.......2.5..6..34.34.2....."
+
+    def write_temporary(self, content: bytes) -> str:
+        file = tempfile.NamedTemporaryFile(delete=False)
+        self.addCleanup(os.remove, file.name)
+        with file:
+            file.write(content)
+        return file.name
+
+    def test_load_packed(self) -> None:
+        path = self.write_temporary((self.ambiguous + "\n" + self.ambiguous.replace('.', '0')).encode())
+
+        packed = PackedPuzzles.load(path, block_records=1)
+
+        self.assertEqual(2, len(packed))
+        self.assertEqual(bytes([0, 0, 0, 0, 0, 3, 0, 1, 7]), packed[0][:9].tobytes())
+        self.assertEqual(packed[0], packed[1])
+        self.assertEqual([self.ambiguous] * 2, [IO.serialize_line(Sudoku.from_packed(p).value) for p in packed])
+
+    def test_load_packed_without_last_line_ending(self) -> None:
+        for ending in ["\n", "\r\n"]:
+            with self.subTest(ending=repr(ending)):
+                path = self.write_temporary((self.ambiguous + ending + self.ambiguous).encode())
+
+                packed = PackedPuzzles.load(path)
+
+                self.assertEqual([self.ambiguous] * 2, [IO.serialize_line(Sudoku.from_packed(p).value) for p in packed])
+
+    def test_load_packed_rejects_invalid_files(self) -> None:
+        for content in [self.ambiguous + "\n" + self.ambiguous[:-1] + "x\n",
+                        self.ambiguous + "\n" + self.ambiguous[1:] + "\n" + self.ambiguous + "\n",
+                        self.ambiguous + "\n" + self.ambiguous[1:],
+                        "\r" + self.ambiguous[1:] + "\n" + self.ambiguous + "\n",
+                        self.ambiguous + "5\n" + self.ambiguous + "5\n"]:
+            with self.subTest(content=content):
+                with self.assertRaises(AssertionError):
+                    PackedPuzzles.load(self.write_temporary(content.encode()))
+
+    def test_solve_packed(self) -> None:
+        packed = PackedPuzzles.load(self.write_temporary((self.ambiguous + "\n").encode()))
+
+        solution = SudokuExactCover().solve_packed(packed[0])
+
+        assert solution is not None
+        sudoku = Sudoku.from_packed(solution)
+        self.assertTrue(sudoku.is_correct())
+        self.assertTrue(sudoku.is_complete())
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'requires numpy')
+    def test_packed_as_numpy(self) -> None:
+        packed = PackedPuzzles.load(self.write_temporary((self.ambiguous + "\r\n").encode() * 3))
+
+        matrix = packed.as_numpy()
+
+        self.assertEqual((3, 81), matrix.shape)
+        self.assertEqual([0, 0, 0, 0, 0, 3, 0, 1, 7], matrix[2, :9].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import argparse
+import sys
+from math import log2
+from typing import Callable, Dict, List, Optional, TypedDict
+
+from project_io import IO
+from sudoku import SearchBudget, Status, Sudoku
+
+# techniques in increasing order of strength, with their difficulty (as rated by Sudoku Explainer when it has them)
+TECHNIQUES: Dict[str, float] = {
+    'hidden_single': 1.5,
+    'naked_single': 2.3,
+    'locked_candidates': 2.6,
+    'naked_pair': 3.0,
+    'naked_triple': 3.6,
+    'guess': 7.0,
+}
+
+Rating = TypedDict('Rating', {'status': Status,
+                              'technique': Optional[str],
+                              'score': float,
+                              'steps': Dict[str, int],
+                              'value': List[List[Optional[int]]]})
+
+
+class _Rater(Sudoku):
+    """
+    Solves like a person would: every step applies the weakest technique that makes progress anywhere in the grid,
+    then starts again from the weakest one. The search only takes over when none of them does.
+    """
+    __slots__ = ()
+
+    def rate(self) -> Rating:
+        steps = {technique: 0 for technique in TECHNIQUES}
+        if not self.is_correct():
+            return self._rating('unsolvable', steps)
+        self._compute_candidate()
+        techniques: Dict[str, Callable[[], bool]] = {
+            'hidden_single': self._hidden_singles,
+            'naked_single': self._naked_singles,
+            'locked_candidates': lambda: self._in_every_unit(self._locked_candidates_in),
+            'naked_pair': lambda: self._in_every_unit(lambda unit: self._naked_subsets_in(unit, (2,))),
+            'naked_triple': lambda: self._in_every_unit(lambda unit: self._naked_subsets_in(unit, (3,))),
+        }
+        while not self.is_complete():
+            # the pending deductions of the search are not used
+            self._clear_pending()
+            for technique, apply in techniques.items():
+                mark = len(self._trail)
+                if not apply():
+                    return self._rating('unsolvable', steps)
+                if len(self._trail) > mark:
+                    steps[technique] += 1
+                    break
+            else:
+                budget = SearchBudget()
+                solved = self._deduce_all() and any(True for _ in self._solutions_r(budget))
+                steps['guess'] = budget.nodes
+                return self._rating('solved' if solved else 'unsolvable', steps)
+        return self._rating('solved', steps)
+
+    def _rating(self, status: Status, steps: Dict[str, int]) -> Rating:
+        used = [technique for technique, count in steps.items() if count]
+        technique = used[-1] if used else None
+        score = TECHNIQUES[technique] if technique is not None else 0.0
+        if technique == 'guess':
+            # the harder the search, the higher
+            score += log2(steps['guess'])
+        return {'status': status, 'technique': technique, 'score': score, 'steps': steps,
+                'value': self._result(status, self._cells)['value']}
+
+    def _hidden_singles(self) -> bool:
+        for unit in range(3 * self.size):
+            if self._hidden_singles_in(unit) is False:
+                return False
+        return True
+
+    def _naked_singles(self) -> bool:
+        cells = self._cells
+        candidates = self._candidates
+        size = self.size
+        for index in range(size * size):
+            mask = candidates[index]
+            if not cells[index] and not mask & (mask - 1):
+                if not mask:
+                    return False
+                self._position(index // size, index % size, mask.bit_length())
+        return True
+
+    def _in_every_unit(self, technique: Callable[[int], bool]) -> bool:
+        return all(technique(unit) for unit in range(3 * self.size))
+
+
+def rate(value: List[List[Optional[int]]]) -> Rating:
+    """
+    Solves the puzzle with the techniques of TECHNIQUES only, the weakest first, guessing when none of them helps.
+    The rating has the number of steps of each technique (search nodes for 'guess'), the hardest technique used
+    and its score: the difficulty of that technique, plus log2 of the search nodes when guessing.
+    """
+    return _Rater(value).rate()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rate puzzles read from stdin, one per line: score, technique, puzzle')
+    parser.parse_args()
+    for line in sys.stdin:
+        for value in IO().read_lines([line]):
+            rating = rate(value)
+            print(f"{rating['score']:.1f} {rating['technique'] or '-'} {line.strip()}")
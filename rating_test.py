@@ -0,0 +1,56 @@
+import unittest
+from typing import List, Optional
+
+from benchmark import corpus
+from project_io import IO
+from rating import TECHNIQUES, rate
+from sudoku import Sudoku
+
+
+class TestRating(unittest.TestCase):
+    def assertSolved(self, value: List[List[Optional[int]]], solution: List[List[Optional[int]]]) -> None:
+        sudoku = Sudoku(solution)
+        self.assertTrue(sudoku.is_complete() and sudoku.is_correct())
+        for row, solution_row in zip(value, solution):
+            for cell, solution_cell in zip(row, solution_row):
+                self.assertIn(cell, (None, solution_cell))
+
+    def test_hardest_technique(self) -> None:
+        # Source: easy1.sud and easy49.sud of https://github.com/jimburton/sudoku, norvig.com/top95.txt and
+        # Arto Inkala's puzzle (see benchmark.CORPORA)
+        for value, technique in [(corpus('easy')[0], 'hidden_single'),
+                                 (corpus('easy')[2], 'naked_pair'),
+                                 (corpus('hard')[0], 'locked_candidates'),
+                                 (corpus('adversarial')[0], 'guess')]:
+            with self.subTest(technique=technique):
+                rating = rate(value)
+
+                self.assertEqual('solved', rating['status'])
+                self.assertEqual(technique, rating['technique'])
+                self.assertSolved(value, rating['value'])
+                self.assertGreater(rating['steps'][technique], 0)
+                self.assertEqual([], [harder for harder in list(TECHNIQUES)[list(TECHNIQUES).index(technique) + 1:]
+                                      if rating['steps'][harder]])
+
+    def test_score_grows_with_the_technique(self) -> None:
+        scores = [rate(value)['score'] for value in [corpus('easy')[0], corpus('hard')[0], corpus('adversarial')[0]]]
+
+        self.assertEqual(sorted(scores), scores)
+        self.assertEqual(TECHNIQUES['hidden_single'], scores[0])
+        self.assertGreater(scores[2], TECHNIQUES['guess'])
+
+    def test_unsolvable(self) -> None:
+        for value in corpus('invalid'):
+            with self.subTest(puzzle=IO.serialize_line(value)):
+                self.assertEqual('unsolvable', rate(value)['status'])
+
+    def test_complete_grid_needs_no_technique(self) -> None:
+        solution = rate(corpus('easy')[0])['value']
+
+        rating = rate(solution)
+
+        self.assertEqual(('solved', None, 0.0), (rating['status'], rating['technique'], rating['score']))
+
+
+if __name__ == '__main__':
+    unittest.main()
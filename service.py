@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TextIO, Tuple
+
+from project_io import IO
+from sudoku import Sudoku
+
+# (request line, deadline, response)
+Request = Tuple[str, float, 'asyncio.Future[str]']
+
+
+def _solve(line: str, max_nodes: Optional[int], deadline: float) -> str:
+    """Runs in a worker process. Answers '<status> <line>', the line being the solution when solved."""
+    result = Sudoku(next(IO().read_lines([line]))).solve(max_nodes, deadline)
+    return f"{result['status']} {IO.serialize_line(result['value']) if result['status'] == 'solved' else line}"
+
+
+def _is_valid(line: str) -> bool:
+    try:
+        next(IO().read_lines([line]))
+    except (AssertionError, ValueError):
+        return False
+    return True
+
+
+class Service:
+    """
+    Solves the puzzles (in the IO.read_lines format) of every connection in a pool of worker processes,
+    answering each connection in the order of its requests.
+    At most `queue_size` puzzles wait for a worker. When the queue is full, the connections are not read until
+    there is room, so the clients are slowed down by flow control instead of piling up requests.
+    Every request has `timeout` seconds from the moment it is read and at most `max_nodes` search nodes: the
+    search stops when either is spent, and requests that expire while waiting are not solved at all.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 64, timeout: float = 1.0,
+                 max_nodes: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: 'asyncio.Queue[Request]'
+        self._tasks: List['asyncio.Task[None]'] = []
+
+    async def __aenter__(self) -> 'Service':
+        self._executor = ProcessPoolExecutor(self.workers)
+        self._queue = asyncio.Queue(self.queue_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exception: object) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        assert self._executor is not None
+        # the solves still running end by their deadline: wait for them off the loop
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            line, deadline, response = await self._queue.get()
+            try:
+                if response.cancelled():
+                    continue
+                if time.monotonic() >= deadline:
+                    result = f"budget_exhausted {line}"
+                else:
+                    result = await loop.run_in_executor(self._executor, _solve, line, self.max_nodes, deadline)
+                if not response.done():
+                    response.set_result(result)
+            except Exception as exception:
+                if not response.done():
+                    response.set_exception(exception)
+            finally:
+                self._queue.task_done()
+
+    async def handle(self, lines: AsyncIterator[str], write: Callable[[str], Awaitable[None]]) -> None:
+        """Answers every line of one connection. Returns once all of them are answered."""
+        loop = asyncio.get_running_loop()
+        responses: 'asyncio.Queue[Optional[asyncio.Future[str]]]' = asyncio.Queue(self.queue_size)
+
+        async def respond() -> None:
+            try:
+                while True:
+                    response = await responses.get()
+                    if response is None:
+                        return
+                    await write(await response + '\n')
+            finally:
+                # the client is gone: the requests still waiting are dropped by the workers
+                while not responses.empty():
+                    pending = responses.get_nowait()
+                    if pending is not None:
+                        pending.cancel()
+
+        writer = asyncio.create_task(respond())
+        try:
+            async for line in lines:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                deadline = time.monotonic() + self.timeout
+                response = loop.create_future()
+                await responses.put(response)
+                if _is_valid(line):
+                    await self._queue.put((line, deadline, response))
+                else:
+                    response.set_result(f"invalid {line}")
+                if writer.done():
+                    break
+        finally:
+            if not writer.done():
+                await responses.put(None)
+            await writer
+
+
+async def _lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    async for line in reader:
+        yield line.decode()
+
+
+async def serve_socket(service: Service, path: str) -> None:
+    """Serves every client of a Unix socket at path, one puzzle per line in both directions."""
+
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def write(text: str) -> None:
+            writer.write(text.encode())
+            await writer.drain()
+
+        try:
+            await service.handle(_lines(reader), write)
+        except (ConnectionError, asyncio.CancelledError):
+            # the client is gone, or the server is shutting down: the connection ends either way
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(connection, path)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_stream(service: Service, input: TextIO, output: TextIO) -> None:
+    """Serves the puzzles read from input (stdin, typically) until its end."""
+    loop = asyncio.get_running_loop()
+
+    async def lines() -> AsyncIterator[str]:
+        while True:
+            line = await loop.run_in_executor(None, input.readline)
+            if not line:
+                return
+            yield line
+
+    async def write(text: str) -> None:
+        output.write(text)
+        output.flush()
+
+    await service.handle(lines(), write)
+
+
+async def _serve(arguments: argparse.Namespace) -> None:
+    async with Service(arguments.workers, arguments.queue_size, arguments.timeout, arguments.max_nodes) as service:
+        if arguments.socket:
+            await serve_socket(service, arguments.socket)
+        else:
+            await serve_stream(service, sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve puzzles sent over stdin or a Unix socket, one per line')
+    parser.add_argument('--socket', help='path of the Unix socket to listen on (default: stdin and stdout)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=1.0, help='seconds per puzzle, waiting included')
+    parser.add_argument('--max-nodes', type=int, default=None, help='search nodes per puzzle')
+    asyncio.run(_serve(parser.parse_args()))
@@ -0,0 +1,69 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from typing import List
+
+from service import Service, serve_socket, serve_stream
+
+# Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+EASY = "..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3.."
+EASY_SOLUTION = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+# Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+IMPOSSIBLE = "36..712...5....18...92.47......13.284..1.2..927.46......53.89...83....6...769..43"
+# Arto Inkala's puzzle, https://www.conceptispuzzles.com/index.aspx?uri=info/article/424
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+HARD_SOLUTION = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    async def serve(self, service: Service, lines: List[str]) -> List[str]:
+        output = io.StringIO()
+        await serve_stream(service, io.StringIO("".join(line + '\n' for line in lines)), output)
+        return output.getvalue().splitlines()
+
+    async def test_answers_in_order(self) -> None:
+        async with Service(workers=2, queue_size=2) as service:
+            responses = await self.serve(service, [EASY, "123", '# comment', IMPOSSIBLE, HARD] * 3)
+
+        self.assertEqual([f"solved {EASY_SOLUTION}", "invalid 123", f"unsolvable {IMPOSSIBLE}",
+                          f"solved {HARD_SOLUTION}"] * 3, responses)
+
+    async def test_node_budget(self) -> None:
+        async with Service(workers=1, max_nodes=1) as service:
+            responses = await self.serve(service, [EASY, HARD])
+
+        self.assertEqual([f"solved {EASY_SOLUTION}", f"budget_exhausted {HARD}"], responses)
+
+    async def test_expired_requests_are_not_solved(self) -> None:
+        async with Service(workers=1, timeout=0) as service:
+            responses = await self.serve(service, [EASY])
+
+        self.assertEqual([f"budget_exhausted {EASY}"], responses)
+
+    async def test_socket(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sudoku.sock')
+            async with Service(workers=1) as service:
+                server = asyncio.create_task(serve_socket(service, path))
+                while not os.path.exists(path):
+                    await asyncio.sleep(0.01)
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(f"{IMPOSSIBLE}\n{EASY}\n".encode())
+                await writer.drain()
+
+                responses = [(await reader.readline()).decode().strip() for _ in range(2)]
+
+                writer.close()
+                await writer.wait_closed()
+                server.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await server
+
+        self.assertEqual([f"unsolvable {IMPOSSIBLE}", f"solved {EASY_SOLUTION}"], responses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+from typing import Optional, Sequence
+
+from sudoku import Choice, GridView, Sudoku
+
+
+class _Board(Sudoku):
+    """A sudoku whose candidates are always the ones computed from its values, edited in place."""
+    __slots__ = ()
+
+    def __init__(self, value: Sequence[Sequence[Optional[int]]]):
+        super().__init__(value)
+        self._compute_candidate()
+        self._clear_pending()
+
+    def place(self, index: int, value: int) -> None:
+        size = self.size
+        self._position(index // size, index % size, value)
+        self._forget()
+
+    def erase(self, index: int) -> None:
+        self._erase(index)
+        self._forget()
+
+    def _forget(self) -> None:
+        # edits are never undone: the trail only has to cover the searches
+        self._trail.clear()
+        self._clear_pending()
+
+    def at(self, index: int) -> int:
+        return self._cells[index]
+
+    def search(self) -> Optional[bytes]:
+        """A solution of the values, if any, leaving everything as it was."""
+        if not self.is_correct():
+            return None
+        solution = None
+        if self._deduce_all() and any(True for _ in self._solutions_r()):
+            solution = bytes(self._cells)
+        self._undo(0)
+        return solution
+
+    def most_constrained(self) -> Optional[int]:
+        """The cell of the first choice the search would make, None when the grid is complete."""
+        for row, column, _ in self._choices():
+            return row * self.size + column
+        return None
+
+
+class Session:
+    """
+    A puzzle edited one cell at a time, as in an interactive front end. The candidates are kept up to date by every
+    placement and erasure (see Sudoku._erase) instead of being computed again, and a solution found once is kept as
+    long as the edits agree with it, so that most edits answer is_solvable and hint without searching.
+    The values of the puzzle are givens: they can be neither erased nor replaced.
+    """
+
+    def __init__(self, value: Sequence[Sequence[Optional[int]]]):
+        self._board = _Board(value)
+        self._givens = bytes(cell or 0 for row in value for cell in row)
+        # a solution of the current values (None when not known), whether there is one (None when not known)
+        self._solution: Optional[bytes] = None
+        self._solvable: Optional[bool] = None
+
+    @property
+    def value(self) -> GridView:
+        return self._board.value
+
+    def is_complete(self) -> bool:
+        return self._board.is_complete()
+
+    def is_correct(self) -> bool:
+        return self._board.is_correct()
+
+    def place(self, row: int, column: int, value: int) -> None:
+        """Puts the value in the cell, replacing the one there, even if it conflicts with others."""
+        index = self._editable(row, column)
+        assert 1 <= value <= self._board.size
+        self._erase(index)
+        self._board.place(index, value)
+        # no solution stays no solution with more values, and the known one stays one if it has that value
+        if self._solvable and self._solution is not None and self._solution[index] != value:
+            self._solution = None
+            self._solvable = None
+
+    def erase(self, row: int, column: int) -> None:
+        self._erase(self._editable(row, column))
+
+    def _erase(self, index: int) -> None:
+        if not self._board.at(index):
+            return
+        self._board.erase(index)
+        # a solution stays one with fewer values, but there may be one again
+        if not self._solvable:
+            self._solvable = None
+
+    def is_solvable(self) -> bool:
+        if self._solvable is None:
+            self._solution = self._board.search()
+            self._solvable = self._solution is not None
+        return self._solvable
+
+    def hint(self) -> Optional[Choice]:
+        """A value of a solution for the most constrained empty cell, None when there is none."""
+        if not self.is_solvable():
+            return None
+        index = self._board.most_constrained()
+        if index is None:
+            return None
+        assert self._solution is not None
+        size = self._board.size
+        return index // size, index % size, self._solution[index]
+
+    def _editable(self, row: int, column: int) -> int:
+        index = row * self._board.size + column
+        if self._givens[index]:
+            raise ValueError(f"The cell ({row}, {column}) is a given")
+        return index
@@ -0,0 +1,71 @@
+import unittest
+
+from benchmark import corpus
+from session import Session
+from sudoku import Sudoku
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self) -> None:
+        # Source: easy1.sud of https://github.com/jimburton/sudoku (see benchmark.CORPORA)
+        self.puzzle = corpus('easy')[0]
+        self.session = Session(self.puzzle)
+        self.solution = [[cell or 0 for cell in row] for row in Sudoku(self.puzzle).solve()['value']]
+        self.empty = [(row, column) for row in range(9) for column in range(9) if self.puzzle[row][column] is None]
+
+    def assertCandidatesComputed(self) -> None:
+        fresh = Sudoku([list(row) for row in self.session.value])
+        fresh._compute_candidate()
+        self.assertEqual(list(fresh._candidates), list(self.session._board._candidates))
+
+    def test_solve_by_hints(self) -> None:
+        while (hint := self.session.hint()) is not None:
+            row, column, value = hint
+            self.assertEqual(self.solution[row][column], value)
+            self.session.place(row, column, value)
+
+        self.assertTrue(self.session.is_complete() and self.session.is_correct())
+        self.assertEqual(self.solution, [list(row) for row in self.session.value])
+
+    def test_wrong_value_then_erased(self) -> None:
+        row, column = self.empty[0]
+        self.session.place(row, column, self.solution[row][column] % 9 + 1)
+
+        self.assertFalse(self.session.is_solvable())
+        self.assertIsNone(self.session.hint())
+
+        self.session.erase(row, column)
+
+        self.assertTrue(self.session.is_solvable())
+        self.assertCandidatesComputed()
+
+    def test_replaced_value(self) -> None:
+        row, column = self.empty[0]
+        self.session.place(row, column, self.solution[row][column] % 9 + 1)
+        self.session.place(row, column, self.solution[row][column])
+
+        self.assertTrue(self.session.is_solvable())
+        self.assertEqual(self.solution[row][column], self.session.value[row][column])
+        self.assertCandidatesComputed()
+
+    def test_candidates_follow_the_edits(self) -> None:
+        for i, (row, column) in enumerate(self.empty[:20]):
+            self.session.place(row, column, i % 9 + 1)
+        for row, column in self.empty[:20:3]:
+            self.session.erase(row, column)
+
+        self.assertCandidatesComputed()
+        self.assertEqual([], self.session._board._trail)
+
+    def test_givens_cannot_be_edited(self) -> None:
+        row, column = next((row, column) for row in range(9) for column in range(9)
+                           if self.puzzle[row][column] is not None)
+
+        with self.assertRaises(ValueError):
+            self.session.place(row, column, 1)
+        with self.assertRaises(ValueError):
+            self.session.erase(row, column)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Dict, List, Optional, Protocol, TypedDict
+
+from exact_cover import SudokuExactCover
+from rating import rate
+from sudoku import SearchStats, Status, Sudoku
+
+Grid = List[List[Optional[int]]]
+SolverResult = TypedDict('SolverResult', {'solution': Optional[List[List[int]]],
+                                          'status': Status,
+                                          'stats': Dict[str, float]})
+
+
+class Solver(Protocol):
+    def solve(self, value: Grid) -> SolverResult: ...
+
+
+SOLVERS: Dict[str, Callable[[], Solver]] = {}
+
+
+def register(name: str, factory: Callable[[], Solver]) -> None:
+    SOLVERS[name] = factory
+
+
+def get_solver(name: str) -> Solver:
+    return SOLVERS[name]()
+
+
+def _result(solution: Optional[List[List[int]]], seconds: float, status: Optional[Status] = None) -> SolverResult:
+    return {'solution': solution,
+            'status': status or ('solved' if solution is not None else 'unsolvable'),
+            'stats': {'seconds': seconds}}
+
+
+class BacktrackingSolver:
+    def __init__(self, instrument: bool = False, max_nodes: Optional[int] = None, timeout: Optional[float] = None):
+        # adds the search statistics (see SearchStats) to the stats of every result
+        self.instrument = instrument
+        # budget of every puzzle: the status is 'budget_exhausted' when spent
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+
+    def solve(self, value: Grid) -> SolverResult:
+        start = time.perf_counter()
+        stats = SearchStats() if self.instrument else None
+        sudoku = Sudoku(value, stats)
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        status = sudoku.solve(self.max_nodes, deadline)['status']
+        solution: Optional[List[List[int]]] = None
+        if status == 'solved':
+            solution = [[cell or 0 for cell in row] for row in sudoku.value]
+        result = _result(solution, time.perf_counter() - start, status)
+        if stats is not None:
+            result['stats'].update(stats.as_dict())
+        return result
+
+
+class DancingLinksSolver:
+    def __init__(self) -> None:
+        self.exact_cover = SudokuExactCover()
+
+    def solve(self, value: Grid) -> SolverResult:
+        start = time.perf_counter()
+        solution = self.exact_cover.solve(value)
+        return _result(solution, time.perf_counter() - start)
+
+
+class RatingSolver:
+    """Solves with the techniques of rating.TECHNIQUES, a person's way: slower, but the stats have the rating."""
+
+    def solve(self, value: Grid) -> SolverResult:
+        start = time.perf_counter()
+        rating = rate(value)
+        solution = [[cell or 0 for cell in row] for row in rating['value']] if rating['status'] == 'solved' else None
+        result = _result(solution, time.perf_counter() - start)
+        result['stats']['score'] = rating['score']
+        for technique, count in rating['steps'].items():
+            result['stats'][f"steps_{technique}"] = count
+        return result
+
+
+register('backtracking', BacktrackingSolver)
+register('dlx', DancingLinksSolver)
+register('rating', RatingSolver)
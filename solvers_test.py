@@ -0,0 +1,98 @@
+import unittest
+
+from project_io import IO
+from rating import rate
+from solvers import SOLVERS, BacktrackingSolver, Grid, SolverResult, get_solver, register
+from sudoku import Sudoku
+
+
+class TestSolvers(unittest.TestCase):
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+    ambiguous = [
+        ".....3.17",
+        ".15..9..8",
+        ".6.......",
+        "1....7...",
+        "..9...2..",
+        "...5....4",
+        ".......2.",
+        "5..6..34.",
+        "34.2....."
+    ]
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+    impossible = [
+        "36..712..",
+        ".5....18.",
+        "..92.47..",
+        "....13.28",
+        "4..1.2..9",
+        "27.46....",
+        "..53.89..",
+        ".83....6.",
+        "..769..43"
+    ]
+
+    def test_every_solver_solves(self) -> None:
+        value = IO().load_generic(self.ambiguous)
+        for name in ['backtracking', 'dlx', 'rating']:
+            with self.subTest(solver=name):
+                result = get_solver(name).solve(value)
+
+                self.assertEqual('solved', result['status'])
+                assert result['solution'] is not None
+                sudoku = Sudoku([list(row) for row in result['solution']])
+                self.assertTrue(sudoku.is_correct())
+                self.assertTrue(sudoku.is_complete())
+                self.assertGreater(result['stats']['seconds'], 0)
+
+    def test_every_solver_reports_unsolvable(self) -> None:
+        value = IO().load_generic(self.impossible)
+        for name in ['backtracking', 'dlx', 'rating']:
+            with self.subTest(solver=name):
+                result = get_solver(name).solve(value)
+
+                self.assertEqual('unsolvable', result['status'])
+                self.assertIsNone(result['solution'])
+
+    def test_rating_solver_reports_the_rating(self) -> None:
+        result = get_solver('rating').solve(IO().load_generic(self.ambiguous))
+
+        self.assertEqual(rate(IO().load_generic(self.ambiguous))['score'], result['stats']['score'])
+        self.assertGreater(result['stats']['steps_hidden_single'], 0)
+
+    def test_instrumented_backtracking(self) -> None:
+        value = IO().load_generic(self.ambiguous)
+
+        result = BacktrackingSolver(instrument=True).solve(value)
+
+        self.assertEqual('solved', result['status'])
+        self.assertIn('nodes', result['stats'])
+        self.assertGreater(result['stats']['deduced'], 0)
+        self.assertNotIn('nodes', get_solver('backtracking').solve(value)['stats'])
+
+    def test_backtracking_budget(self) -> None:
+        # Arto Inkala's puzzle, https://www.conceptispuzzles.com/index.aspx?uri=info/article/424
+        value = IO().load_generic(["8........", "..36.....", ".7..9.2..", ".5...7...", "....457..", "...1...3.",
+                                   "..1....68", "..85...1.", ".9....4.."])
+
+        exhausted = BacktrackingSolver(max_nodes=1).solve(value)
+        timed_out = BacktrackingSolver(timeout=0).solve(value)
+
+        self.assertEqual(('budget_exhausted', None), (exhausted['status'], exhausted['solution']))
+        self.assertEqual('budget_exhausted', timed_out['status'])
+        self.assertEqual('solved', BacktrackingSolver(max_nodes=1000).solve(value)['status'])
+
+    def test_register_solver(self) -> None:
+        class Unsolvable:
+            def solve(self, value: Grid) -> SolverResult:
+                return {'solution': None, 'status': 'unsolvable', 'stats': {'seconds': 0.0}}
+
+        register('unsolvable', Unsolvable)
+        try:
+            self.assertEqual('unsolvable', get_solver('unsolvable').solve([])['status'])
+        finally:
+            del SOLVERS['unsolvable']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,334 +1,849 @@
-import functools
+import time
+from array import array
+from collections import deque
 from functools import reduce
+from itertools import combinations
+from math import isqrt
 from operator import and_
-from typing import List, Optional, Callable, Any, TypedDict
+from typing import List, Optional, Callable, Any, Tuple, Sequence, Deque, Iterator, Dict, MutableSequence, TypeVar, \
+    overload, Union, Literal, TypedDict, Protocol, Generator
 
 from logzero import logger  # type: ignore
 
-SIZE: int = 9
+# row, column, value
+Choice = Tuple[int, int, int]
+# (container, index, previous value)
+TrailEntry = Tuple[MutableSequence[int], int, int]
+T = TypeVar('T')
+Status = Literal['solved', 'unsolvable', 'budget_exhausted']
+SolveResult = TypedDict('SolveResult', {'status': Status, 'value': List[List[Optional[int]]]})
+# (cells shared with a crossing unit, rest of the cells of the crossing unit)
+Intersection = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+# symbol of each value in text, the value 1 first (A is 10 on 16x16 and 25x25 grids)
+DIGITS: str = '123456789ABCDEFGHIJKLMNOP'
+
+
+class Geometry:
+    """
+    Index tables of the grids of box x box squares (SIZE = box * box rows, columns, squares and values).
+    They are built once per size (see geometry) and shared by all the sudokus of that size.
+    """
+    __slots__ = ('box', 'size', 'all_candidates', 'units', 'units_of_cell', 'square_of_cell', 'peers',
+                 'intersections', 'masks')
+
+    def __init__(self, box: int):
+        size = box * box
+        assert 2 <= box and size <= len(DIGITS), f"Unsupported box of {box}x{box}"
+        self.box = box
+        self.size = size
+        # bit (value - 1) is set when the value is still a candidate
+        self.all_candidates = (1 << size) - 1
+        # cell indexes (row * SIZE + column) of every unit: the rows, then the columns, then the squares
+        self.units: List[Tuple[int, ...]] = (
+                [tuple(row * size + column for column in range(size)) for row in range(size)] +
+                [tuple(row * size + column for row in range(size)) for column in range(size)] +
+                [tuple((square // box * box + i // box) * size + square % box * box + i % box for i in range(size))
+                 for square in range(size)])
+        # cell index -> its square
+        self.square_of_cell: List[int] = [0] * (size * size)
+        for square in range(size):
+            for index in self.units[2 * size + square]:
+                self.square_of_cell[index] = square
+        # cell index -> its row, column and square units
+        self.units_of_cell: List[Tuple[int, ...]] = [
+            (index // size, size + index % size, 2 * size + self.square_of_cell[index]) for index in range(size * size)]
+        # cell index -> the other cells of its row, column and square
+        self.peers: List[Tuple[int, ...]] = [
+            tuple(sorted({peer for unit in self.units_of_cell[index] for peer in self.units[unit]} - {index}))
+            for index in range(size * size)]
+        # unit -> ways of splitting it by crossing units
+        self.intersections: List[List[List[Intersection]]] = [self._intersections(unit) for unit in range(3 * size)]
+        # typecode of the arrays of value bit masks
+        self.masks = 'H' if size <= 16 else 'L'
+
+    def _intersections(self, unit: int) -> List[List[Intersection]]:
+        # a row or a column is split by the squares; a square, by the rows and by the columns
+        size = self.size
+        crossing = [range(2 * size, 3 * size)] if unit < 2 * size else [range(0, size), range(size, 2 * size)]
+        result: List[List[Intersection]] = []
+        for units in crossing:
+            partition: List[Intersection] = []
+            for other in units:
+                cells = set(self.units[other])
+                shared = tuple(index for index in self.units[unit] if index in cells)
+                if shared:
+                    partition.append((shared, tuple(index for index in self.units[other] if index not in shared)))
+            result.append(partition)
+        return result
+
+
+_GEOMETRIES: Dict[int, Geometry] = {}
+
+
+def geometry(size: int) -> Geometry:
+    """The geometry of size x size grids (9, 16 or 25), built on first use."""
+    result = _GEOMETRIES.get(size)
+    if result is None:
+        box = isqrt(size)
+        assert box * box == size, f"Expected a square number of rows, found {size}"
+        result = _GEOMETRIES[size] = Geometry(box)
+    return result
+
+
+# the classic 9x9 grid
+CLASSIC: Geometry = geometry(9)
+SIZE: int = CLASSIC.size
+ALL_CANDIDATES: int = CLASSIC.all_candidates
+UNITS: List[Tuple[int, ...]] = CLASSIC.units
+UNITS_OF_CELL: List[Tuple[int, ...]] = CLASSIC.units_of_cell
+SQUARE_OF_CELL: List[int] = CLASSIC.square_of_cell
+PEERS: List[Tuple[int, ...]] = CLASSIC.peers
+INTERSECTIONS: List[List[List[Intersection]]] = CLASSIC.intersections
+
+# indexes of Sudoku._tally
+_FILLED: int = 0
+_CONFLICTS: int = 1
+
+
+class SearchStats:
+    """
+    Opt-in instrumentation of Sudoku.solve: pass an instance to the Sudoku constructor.
+    Only that Sudoku times its phases (see _InstrumentedSudoku), sudokus without stats run the plain methods.
+    """
+    PHASES = ('is_correct', '_compute_candidate', '_deduce_candidates', '_choices')
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.backtracks = 0
+        self.depth = 0
+        self.max_depth = 0
+        # cells filled by the deductions and by the choices of the search
+        self.deduced = 0
+        self.guessed = 0
+        # phase -> seconds
+        self.seconds: Dict[str, float] = {phase: 0.0 for phase in self.PHASES}
+
+    def as_dict(self) -> Dict[str, float]:
+        result: Dict[str, float] = {'nodes': self.nodes, 'backtracks': self.backtracks, 'max_depth': self.max_depth,
+                                    'deduced': self.deduced, 'guessed': self.guessed}
+        for phase, seconds in self.seconds.items():
+            result[f"seconds_{phase.lstrip('_')}"] = seconds
+        return result
 
-Choice = TypedDict('Choice', {'position': List[int], 'value': int})
+
+class Flag(Protocol):
+    # threading.Event, multiprocessing.Event
+    def is_set(self) -> bool: ...
+
+
+class SearchBudget:
+    """
+    Limits of a search, checked cooperatively at every node: at most max_nodes nodes, until deadline (a
+    time.monotonic() value, which processes on the same host share), until event is set (by another thread
+    or process). cancel() stops it too.
+    """
+    # nodes between two readings of the clock and the event
+    CLOCK_INTERVAL = 32
+
+    def __init__(self, max_nodes: Optional[int] = None, deadline: Optional[float] = None,
+                 event: Optional[Flag] = None):
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.event = event
+        self.nodes = 0
+        self.exhausted = False
+        # values of the search state with the most filled cells, and how many
+        self.deepest: Optional[bytes] = None
+        self.deepest_filled = -1
+
+    def cancel(self) -> None:
+        self.exhausted = True
+
+    def spend(self) -> bool:
+        """Counts one more node. False when the search has to stop instead."""
+        if self.exhausted:
+            return False
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes or self.nodes % self.CLOCK_INTERVAL == 1 and (
+                self.deadline is not None and time.monotonic() >= self.deadline or
+                self.event is not None and self.event.is_set()):
+            self.exhausted = True
+        return not self.exhausted
+
+    def reached(self, cells: bytearray, filled: int) -> None:
+        if filled > self.deepest_filled:
+            self.deepest = bytes(cells)
+            self.deepest_filled = filled
+
+
+class GridView(Sequence[Tuple[Optional[int], ...]]):
+    """Read-only rows of a grid stored as size * size bytes in row order, None for the empty cells."""
+    __slots__ = ('_cells', '_size')
+
+    def __init__(self, cells: bytearray, size: int):
+        self._cells = cells
+        self._size = size
+
+    @overload
+    def __getitem__(self, row: int) -> Tuple[Optional[int], ...]: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> List[Tuple[Optional[int], ...]]: ...
+
+    def __getitem__(self, row: Union[int, slice]) -> Any:
+        size = self._size
+        if isinstance(row, slice):
+            return [self[i] for i in range(size)[row]]
+        start = range(size)[row] * size
+        return tuple(cell or None for cell in self._cells[start:start + size])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self) -> str:
+        return repr([list(row) for row in self])
 
 
 class Sudoku:
-    def __init__(self, value: List[List[Optional[int]]]):
-        assert len(value) == 9
+    """
+    A sudoku of any size in the geometry tables (9x9 by default, 16x16, 25x25), with values from 1 to its size.
+    SIZE below stands for that size.
+    """
+    __slots__ = ('_geometry', '_cells', '_rows', '_columns', '_squares', '_candidates', '_trail', '_queue', '_queued',
+                 '_singles', '_occupancy', '_tally', 'stats', '__weakref__')
+
+    def __init__(self, value: Sequence[Sequence[Optional[int]]], stats: Optional[SearchStats] = None):
+        size = len(value)
         # https://stackoverflow.com/questions/35429478/testing-and-assertion-in-list-comprehension
-        assert reduce(and_, [len(row) == 9 for row in value])
-
-        self.value = value
-        # value (0_based) -> row -> column
-        self._is_empty: list[list[list[bool]]] = self._empty_candidates()
+        assert reduce(and_, [len(row) == size for row in value])
+        self._initialize(bytearray(cell or 0 for row in value for cell in row), stats)
+
+    def _initialize(self, cells: bytearray, stats: Optional[SearchStats]) -> None:
+        self._geometry = geometry_ = geometry(isqrt(len(cells)))
+        size = geometry_.size
+        assert len(cells) == size * size and (not cells or max(cells) <= size)
+        # row * SIZE + column -> value, 0 when empty
+        self._cells = cells
+        # value (0_based) bit masks of the numbers already placed in each row, column and square
+        self._rows = array(geometry_.masks, [0] * size)
+        self._columns = array(geometry_.masks, [0] * size)
+        self._squares = array(geometry_.masks, [0] * size)
+        # row * SIZE + column -> value (0_based) bit mask of the candidates for that cell
+        self._candidates = self._empty_candidates()
+        # undo log of every change to the values and candidates since the last full computation
+        self._trail: List[TrailEntry] = []
+        # pending deductions: units whose candidates changed, cells left with one candidate (or none)
+        self._queue: Deque[int] = deque()
+        self._queued = bytearray(3 * size)
+        self._singles: List[int] = []
+        # unit * SIZE + value (0_based) -> times the value is placed in the unit
+        self._occupancy = bytearray(3 * size * size)
+        # filled cells, values placed more than once in some unit (one per extra placement)
+        self._tally = bytearray(2) if size * size < 256 else array('H', [0, 0])
+        for index, value_ in enumerate(cells):
+            if value_:
+                self._occupy(index, value_ - 1)
+        # nothing to undo before the first placement
+        self._trail.clear()
+
+        self.stats = stats
+        if stats is not None:
+            # the same instance, with the methods that time each phase
+            self.__class__ = _InstrumentedSudoku
+
+    @property
+    def value(self) -> GridView:
+        return GridView(self._cells, self._geometry.size)
+
+    @property
+    def size(self) -> int:
+        return self._geometry.size
+
+    @classmethod
+    def from_packed(cls, packed: Sequence[int]) -> 'Sudoku':
+        """Sudoku from SIZE * SIZE values in row order, 0 for the empty cells (see project_io.PackedPuzzles)."""
+        sudoku = cls.__new__(cls)
+        sudoku._initialize(bytearray(packed), None)
+        return sudoku
 
-    @functools.cache
     def cells_for_square_at(self, row: int, column: int) -> List[List[int]]:
-        return [[i, j] for i in range(row - row % 3, row - row % 3 + 3) for j in
-                range(column - column % 3, column - column % 3 + 3)]
+        size = self._geometry.size
+        return [[index // size, index % size]
+                for index in self._geometry.units[2 * size + self._square_for(row, column)]]
 
     def _occupied_cells(self) -> int:
-        result = 0
-        for row in range(0, SIZE):
-            for column in range(0, SIZE):
-                if self.value[row][column] is not None:
-                    result += 1
-        return result
+        return self._tally[_FILLED]
 
     def is_complete(self) -> bool:
-        return all([len(list(filter(lambda cell: cell is not None, row))) == 9 for row in self.value])
+        return self._tally[_FILLED] == len(self._cells)
 
-    @staticmethod
-    @functools.cache
-    def _square_for(row: int, column: int) -> int:
-        x = row // 3
-        y = column // 3
-        return x * 3 + y
+    def _square_for(self, row: int, column: int) -> int:
+        return self._geometry.square_of_cell[row * self._geometry.size + column]
 
     def is_correct(self) -> bool:
-        frequency_column: list[list[int]] = [[0 for _ in range(9)] for _ in range(9)]
-        frequency_square: list[list[int]] = [[0 for _ in range(9)] for _ in range(9)]
-        frequency_row: list[list[int]] = [[0 for _ in range(9)] for _ in range(9)]
-        for row in range(0, SIZE):
-            for column in range(0, SIZE):
-                value_optional = self.value[row][column]
-                if value_optional is None: continue
-                value_0 = value_optional - 1
-                frequency_row[row][value_0] += 1
-                frequency_column[column][value_0] += 1
-                frequency_square[Sudoku._square_for(row, column)][value_0] += 1
-
-        for i in range(0, len(frequency_row)):
-            for value_0 in range(0, SIZE):
-                if frequency_row[i][value_0] > 1:
-                    # logger.debug(f"Repeated element {value_0 + 1} in row {i}")
-                    return False
-
-        for i in range(0, len(frequency_column)):
-            for value_0 in range(0, SIZE):
-                if frequency_column[i][value_0] > 1:
-                    # logger.debug(f"Repeated element {value_0 + 1} in column {i}")
-                    return False
-
-        for i in range(0, len(frequency_square)):
-            for value_0 in range(0, SIZE):
-                if frequency_square[i][value_0] > 1:
-                    # logger.debug(f"Repeated element {value_0 + 1} in square {i}")
-                    return False
-
-        return True
-
-    def solve(self) -> None:
+        return not self._tally[_CONFLICTS]
+
+    def solve(self, max_nodes: Optional[int] = None, deadline: Optional[float] = None,
+              budget: Optional[SearchBudget] = None) -> SolveResult:
+        """
+        Fills the values with a solution, if there is one, searching at most max_nodes nodes until deadline
+        (a time.monotonic() value), or within a budget that may be shared or cancelled.
+        When the budget is exhausted, the values are left as deduced before searching, and the result has the
+        grid with the most cells filled that the search reached (some of them guesses, not deductions).
+        """
+        if budget is None:
+            budget = SearchBudget(max_nodes, deadline)
         if not self.is_correct():
-            return
+            return self._result('unsolvable', self._cells)
         self._compute_candidate()
-        self._deduce_candidates()
-        if self._occupied_cells() == SIZE * SIZE:
-            return
+        if not self._deduce_candidates():
+            return self._result('unsolvable', self._cells)
 
         # logger.debug(f"After deducing: {self._occupied_cells()} elements")
         # self.print_values("Before start backtracking")
 
-        self.solve_r()
+        if self.is_complete() or self.solve_r(budget):
+            return self._result('solved', self._cells)
+        if budget.exhausted:
+            return self._result('budget_exhausted', budget.deepest or self._cells)
+        return self._result('unsolvable', self._cells)
 
-        # self.print_values("After backtracking")
+    def _result(self, status: Status, cells: Union[bytes, bytearray]) -> SolveResult:
+        size = self._geometry.size
+        return {'status': status,
+                'value': [[cells[row * size + column] or None for column in range(size)] for row in range(size)]}
 
-    def solve_r(self) -> bool:
-        if self.is_correct() and self._occupied_cells() == SIZE * SIZE:
+    def solve_r(self, budget: Optional[SearchBudget] = None) -> bool:
+        # stops at the first solution, leaving it in value
+        for _ in self._solutions_r(budget):
             return True
+        return False
+
+    def count_solutions(self, limit: Optional[int] = None, budget: Optional[SearchBudget] = None) -> int:
+        """
+        Number of solutions, up to `limit` (all of them when None). The search goes on from each solution
+        to the next one instead of starting again. The values are left as they were.
+        When the budget is exhausted, the result is only the number of solutions found until then.
+        """
+        if limit == 0 or not self.is_correct():
+            return 0
         self._compute_candidate()
-        choice: Choice
-        for choice in self._choices():
-            aux = self._copy()
-            self._position(choice['position'][0], choice['position'][1], choice['value'])
-            self._deduce_candidates()
-            if self.solve_r():
-                return True
-            self._copy_from(aux)
+        count = 0
+        if self._deduce_candidates():
+            for _ in self._solutions_r(budget):
+                count += 1
+                if count == limit:
+                    break
+        self._undo(0)
+        return count
+
+    def iter_solutions(self, budget: Optional[SearchBudget] = None) -> Generator[List[List[int]], None, None]:
+        """
+        Yields every solution as soon as the search finds it, and goes on to the next one only when resumed.
+        The search state is kept in between (value holds the last solution): take as many as needed, then close
+        the generator, or drop it, to leave the values as they were. The budget stops the enumeration too.
+        """
+        if not self.is_correct():
+            return
+        self._compute_candidate()
+        try:
+            if self._deduce_candidates():
+                size = self._geometry.size
+                for _ in self._solutions_r(budget):
+                    cells = self._cells
+                    yield [list(cells[row * size:row * size + size]) for row in range(size)]
+        finally:
+            self._undo(0)
+
+    def is_unique(self) -> bool:
+        return self.count_solutions(limit=2) == 1
+
+    def subproblems(self) -> Iterator[bytes]:
+        """
+        The values (packed as for from_packed) after each alternative of the first choice of the search, with
+        everything deduced from it. Together they have the same solutions as this sudoku, each of them once.
+        A complete sudoku is its own only subproblem. The values are left as they were.
+        """
+        if not self.is_correct():
+            return
+        self._compute_candidate()
+        try:
+            if not self._deduce_candidates():
+                return
+            if self.is_complete():
+                yield bytes(self._cells)
+                return
+            for row, column, value in self._choices():
+                mark = len(self._trail)
+                self._position(row, column, value)
+                if self._deduce_candidates():
+                    yield bytes(self._cells)
+                self._undo(mark)
+        finally:
+            self._undo(0)
+
+    def _solutions_r(self, budget: Optional[SearchBudget] = None) -> Iterator[None]:
+        """Yields every time value holds a solution, then backtracks from it when resumed."""
+        if budget is not None:
+            if not budget.spend():
+                return
+            budget.reached(self._cells, self._tally[_FILLED])
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, stats.depth)
+        if self.is_complete():
+            if self.is_correct():
+                yield None
+            return
+        for row, column, value in self._choices():
+            mark = len(self._trail)
+            self._position(row, column, value)
+            if stats is not None:
+                stats.guessed += 1
+                stats.depth += 1
+            if self._deduce_candidates():
+                yield from self._solutions_r(budget)
+            if stats is not None:
+                stats.depth -= 1
+            self._undo(mark)
+            if stats is not None:
+                stats.backtracks += 1
+            if budget is not None and budget.exhausted:
+                return
+
+    def _deduce_candidates(self) -> bool:
+        """
+        Applies the deductions pending since the last call, until there are no more.
+        Returns False when the sudoku turns out to be unsolvable.
+        """
+        singles = self._singles
+        queue = self._queue
+        size = self._geometry.size
+        while singles or queue:
+            if singles:
+                index = singles.pop()
+                if self._cells[index]:
+                    continue
+                mask = self._candidates[index]
+                if not mask:
+                    return self.__contradiction()
+                # naked single
+                self._position(index // size, index % size, mask.bit_length())
+                continue
+            unit = queue.popleft()
+            self._queued[unit] = False
+            if not self._deduce_in_unit(unit):
+                return self.__contradiction()
+        return True
 
+    def __contradiction(self) -> bool:
+        self._clear_pending()
         return False
-        # logger.debug(f"Still correct? {self.is_correct()}")
-
-    def _deduce_candidates(self) -> None:
-        assert (self.is_correct())
-        frequency_number: list[int] = [0 for _ in range(9)]
-        for row in range(0, SIZE):
-            for column in range(0, SIZE):
-                value_optional = self.value[row][column]
-                if value_optional is None: continue
-                value_0 = value_optional - 1
-                frequency_number[value_0] += 1
-
-        while True:
-            filled_this_iteration: bool = False
-            for value_candidate in range(0, SIZE):
-                if frequency_number[value_candidate] == SIZE: continue
-                for row in range(0, SIZE):
-                    for column in range(0, SIZE):
-                        value_ = self.value[row][column]
-                        if value_ is not None:
-                            continue
-                        filled_this_iteration |= self._fill_candidate_in(column, row, value_candidate)
-            if not filled_this_iteration:
-                break
 
-    def _fill_candidate_in(self, column: int, row: int, value_candidate: int) -> bool:
-        by_square_positions = self.cells_for_square_at(row, column)
-        by_square = list(
-            filter(lambda position: position if self._is_empty[value_candidate][position[0]][position[1]] else None,
-                   by_square_positions))
-        if len(by_square) == 1:
-            self._position(by_square[0][0], by_square[0][1], value_candidate + 1)
+    def _clear_pending(self) -> None:
+        self._singles.clear()
+        self._queue.clear()
+        self._queued = bytearray(len(self._queued))
+
+    def _deduce_in_unit(self, unit: int) -> bool:
+        hidden = self._hidden_singles_in(unit)
+        if hidden is not None:
+            return hidden
+        return self._locked_candidates_in(unit) and self._naked_subsets_in(unit)
+
+    def _hidden_singles_in(self, unit: int) -> Optional[bool]:
+        """
+        Places the values with a single cell left in the unit. Returns None when there are none, False when the
+        unit cannot be completed.
+        """
+        candidates = self._candidates
+        geometry_ = self._geometry
+        size = geometry_.size
+        cells = geometry_.units[unit]
+        at_least_once = 0
+        more_than_once = 0
+        for index in cells:
+            mask = candidates[index]
+            more_than_once |= at_least_once & mask
+            at_least_once |= mask
+        placed = (self._rows, self._columns, self._squares)[unit // size][unit % size]
+        if at_least_once | placed != geometry_.all_candidates:
+            # some value has no place left in this unit
+            return False
+
+        hidden = at_least_once & ~more_than_once
+        if hidden:
+            for index in cells:
+                mask = candidates[index] & hidden
+                if mask:
+                    if mask & (mask - 1):
+                        # two values can only go in the same cell
+                        return False
+                    self._position(index // size, index % size, mask.bit_length())
             return True
-        return False
+        return None
+
+    def _locked_candidates_in(self, unit: int) -> bool:
+        """Pointing (square) and box/line reduction (row, column): a value confined to one crossing unit."""
+        candidates = self._candidates
+        for partition in self._geometry.intersections[unit]:
+            segments = []
+            # values in at least one segment, in more than one
+            once = more = 0
+            for shared, _ in partition:
+                segment = 0
+                for index in shared:
+                    segment |= candidates[index]
+                segments.append(segment)
+                more |= once & segment
+                once |= segment
+            single = once & ~more
+            if not single:
+                continue
+            for segment, (_, rest) in zip(segments, partition):
+                confined = segment & single
+                if confined:
+                    for index in rest:
+                        self._eliminate(index, confined)
+        return True
 
-    def print_candidates(self, value_0_range: range = range(0, SIZE),
+    def _naked_subsets_in(self, unit: int, sizes: Sequence[int] = (2, 3)) -> bool:
+        """Naked pairs and triples: n cells of the unit with only n candidates between them."""
+        candidates = self._candidates
+        empty = [index for index in self._geometry.units[unit] if candidates[index]]
+        for size in sizes:
+            if len(empty) <= size:
+                break
+            small = [index for index in empty if _count(candidates[index]) <= size]
+            for subset in combinations(small, size):
+                union = 0
+                for index in subset:
+                    union |= candidates[index]
+                if _count(union) < size:
+                    return False
+                if _count(union) == size:
+                    for index in empty:
+                        if index not in subset:
+                            self._eliminate(index, union)
+        return True
+
+    def print_candidates(self, value_0_range: Optional[range] = None,
                          function: Callable[[str], None] = logger.debug) -> None:
-        for value_0 in value_0_range:
-            function(f"Candidates for {value_0 + 1}:")
-            for row in range(0, SIZE):
-                row_text = []
-                for column in range(0, SIZE):
-                    row_text.append(f"{'X' if self._is_empty[value_0][row][column] else ' '} ")
-                    if column == 2 or column == 5:
-                        row_text.append("| ")
-                function("".join(row_text))
-                if row == 2 or row == 5:
-                    function("- - - + - - - + - - -")
-
-    @staticmethod
-    def _empty_candidates() -> list[list[list[bool]]]:
-        result: list[list[list[bool]]] = [
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ],
-            [
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True],
-                [True, True, True, True, True, True, True, True, True]
-            ]
-        ]
-        return result
+        size = self._geometry.size
+        for value_0 in range(0, size) if value_0_range is None else value_0_range:
+            function(f"Candidates for {DIGITS[value_0]}:")
+            self._print_grid(lambda index: 'X' if self._candidates[index] & (1 << value_0) else ' ', function)
+
+    def _empty_candidates(self) -> List[int]:
+        return [self._geometry.all_candidates] * len(self._cells)
 
     def _compute_candidate(self) -> None:
-        self._is_empty = self._empty_candidates()
-        for row_value in range(0, SIZE):
-            for column_value in range(0, SIZE):
-                value_ = self.value[row_value][column_value]
-                if value_ is None:
-                    continue
-                value_0 = value_ - 1
-                for i in range(0, SIZE):
-                    self._is_empty[value_0][i][column_value] = False
-                    self._is_empty[value_0][row_value][i] = False
-                    self._is_empty[i][row_value][column_value] = False
-                self.__set_occupied_square(row_value, column_value, value_0)
+        self._trail = []
+        self._clear_pending()
+        geometry_ = self._geometry
+        size = geometry_.size
+        square_of_cell = geometry_.square_of_cell
+        self._rows = array(geometry_.masks, [0] * size)
+        self._columns = array(geometry_.masks, [0] * size)
+        self._squares = array(geometry_.masks, [0] * size)
+        cells = self._cells
+        for index in range(size * size):
+            if not cells[index]:
+                continue
+            bit = 1 << (cells[index] - 1)
+            self._rows[index // size] |= bit
+            self._columns[index % size] |= bit
+            self._squares[square_of_cell[index]] |= bit
+
+        self._candidates = self._empty_candidates()
+        for index in range(size * size):
+            if cells[index]:
+                self._candidates[index] = 0
+                continue
+            self._candidates[index] &= ~(self._rows[index // size] | self._columns[index % size] |
+                                         self._squares[square_of_cell[index]])
+            self.__changed(index, self._candidates[index])
 
     def _compute_candidate_partial(self, row: int, column: int, value_0: int) -> None:
-        for i in range(0, SIZE):
-            self._is_empty[value_0][i][column] = False
-            self._is_empty[value_0][row][i] = False
-            self._is_empty[i][row][column] = False
-        self.__set_occupied_square(row, column, value_0)
-
-    def __set_occupied_square(self, row_value: int, column_value: int, value_0: int) -> None:
-        for [row_value, column_value] in self.cells_for_square_at(row_value, column_value):
-            self._is_empty[value_0][row_value][column_value] = False
+        bit = 1 << value_0
+        geometry_ = self._geometry
+        index = row * geometry_.size + column
+        square = geometry_.square_of_cell[index]
+        trail = self._trail
+        trail.append((self._rows, row, self._rows[row]))
+        trail.append((self._columns, column, self._columns[column]))
+        trail.append((self._squares, square, self._squares[square]))
+        self._rows[row] |= bit
+        self._columns[column] |= bit
+        self._squares[square] |= bit
+
+        self._eliminate(index, geometry_.all_candidates)
+        for peer in geometry_.peers[index]:
+            self._eliminate(peer, bit)
+
+    def _eliminate(self, index: int, bits: int) -> None:
+        previous = self._candidates[index]
+        if previous & bits:
+            self._trail.append((self._candidates, index, previous))
+            mask = previous & ~bits
+            self._candidates[index] = mask
+            self.__changed(index, mask)
+
+    def __changed(self, index: int, mask: int) -> None:
+        for unit in self._geometry.units_of_cell[index]:
+            if not self._queued[unit]:
+                self._queued[unit] = 1
+                self._queue.append(unit)
+        if not mask & (mask - 1):
+            self._singles.append(index)
+
+    def _undo(self, mark: int) -> None:
+        trail = self._trail
+        while len(trail) > mark:
+            container, index, previous = trail.pop()
+            container[index] = previous
+        self._clear_pending()
 
     def print_values(self, message: str, function: Callable[[str], None] = logger.info) -> None:
         function(f"{message}: is correct? {self.is_correct().__str__()}")
         self._print_values(function)
 
     def _print_values(self, function: Callable[[str], None]) -> None:
-        for row in range(0, SIZE):
-            row_text: list[str] = []
-            for column in range(0, SIZE):
-                row_text.append(f"{self.value[row][column] if self.value[row][column] is not None else ' '} ")
-                if column == 2 or column == 5:
+        self._print_grid(lambda index: DIGITS[self._cells[index] - 1] if self._cells[index] else ' ', function)
+
+    def _print_grid(self, text: Callable[[int], str], function: Callable[[str], None]) -> None:
+        box = self._geometry.box
+        size = self._geometry.size
+        for row in range(0, size):
+            row_text: List[str] = []
+            for column in range(0, size):
+                row_text.append(f"{text(row * size + column)} ")
+                if column % box == box - 1 and column < size - 1:
                     row_text.append("| ")
             function("".join(row_text))
-            if row == 2 or row == 5:
-                function("- - - + - - - + - - -")
-
-    def _choices(self) -> list[Choice]:
-        min_ocurrences = 9
-        selected_positions: List[Any] = []
-        for value_0 in range(SIZE):
-            # column with the least candidates
-            for row in range(0, SIZE):
-                current_positions: List[Any] = []
-                current_occurrences = 0
-                for column in range(0, SIZE):
-                    if self._is_empty[value_0][row][column]:
-                        current_occurrences += 1
-                        current_positions.append({'position': [row, column], 'value': value_0 + 1})
-                if 0 < current_occurrences < min_ocurrences:
-                    min_ocurrences = current_occurrences
-                    selected_positions = current_positions.copy()
-
-        return selected_positions
-
-    def _copy(self) -> list[list[Optional[int]]]:
-        result = []
-        for row in self.value:
-            result.append(row.copy())
-        return result
+            if row % box == box - 1 and row < size - 1:
+                function(" + ".join([" ".join(["-"] * box)] * box))
+
+    def _choices(self) -> Iterator[Choice]:
+        """
+        Alternatives for the most constrained decision (minimum remaining values): either the empty cell with
+        the fewest candidates or the value with the fewest places left in a unit. Ties go to the cell, then to the
+        first found. Values are counted place by place only when no cell or value has two.
+        """
+        candidates = self._candidates
+        size = self._geometry.size
+        best_index = -1
+        best_count = size + 1
+        for index in range(size * size):
+            mask = candidates[index]
+            if mask:
+                count = _count(mask)
+                if count < best_count:
+                    best_index = index
+                    best_count = count
+                    if count <= 2:
+                        break
+
+        best_cells: Sequence[int] = ()
+        best_bit = 0
+        if best_count > 2:
+            for cells in self._geometry.units:
+                once = twice = more = 0
+                for index in cells:
+                    mask = candidates[index]
+                    more |= twice & mask
+                    twice |= once & mask
+                    once |= mask
+                exactly_twice = twice & ~more
+                if exactly_twice:
+                    best_cells, best_bit = cells, exactly_twice & -exactly_twice
+                    break
+            else:
+                if best_count > 3:
+                    best_cells, best_bit = self._fewest_places(best_count)
+        if best_bit:
+            for index in best_cells:
+                if candidates[index] & best_bit:
+                    yield index // size, index % size, best_bit.bit_length()
+            return
 
-    def _copy_from(self, aux: List[List[Optional[int]]]) -> None:
-        self.value = []
-        for row in aux:
-            self.value.append(row.copy())
-        self._compute_candidate()
+        if best_index < 0:
+            return
+        mask = candidates[best_index]
+        while mask:
+            bit = mask & -mask
+            yield best_index // size, best_index % size, bit.bit_length()
+            mask ^= bit
+
+    def _fewest_places(self, best_count: int) -> Tuple[Sequence[int], int]:
+        """The unit and the value (as a bit) with the fewest places left in it, if fewer than best_count."""
+        candidates = self._candidates
+        size = self._geometry.size
+        best_cells: Sequence[int] = ()
+        best_bit = 0
+        for cells in self._geometry.units:
+            # the places of every value, in binary: planes[k] has the values whose count has bit k set
+            planes = [0] * size.bit_length()
+            for index in cells:
+                carry = candidates[index]
+                k = 0
+                while carry:
+                    plane = planes[k]
+                    planes[k] = plane ^ carry
+                    carry &= plane
+                    k += 1
+            counts = [0] * size
+            for k, plane in enumerate(planes):
+                while plane:
+                    bit = plane & -plane
+                    plane ^= bit
+                    counts[bit.bit_length() - 1] += 1 << k
+            for value_0, count in enumerate(counts):
+                if 0 < count < best_count:
+                    best_cells, best_bit, best_count = cells, 1 << value_0, count
+        return best_cells, best_bit
 
     def _position(self, row: int, column: int, value: int) -> None:
-        self.value[row][column] = value
-        self._compute_candidate_partial(row, column, value - 1)
\ No newline at end of file
+        index = row * self._geometry.size + column
+        self._trail.append((self._cells, index, self._cells[index]))
+        self._cells[index] = value
+        self._occupy(index, value - 1)
+        self._compute_candidate_partial(row, column, value - 1)
+
+    def _occupy(self, index: int, value_0: int) -> None:
+        """Counts a value placed in an empty cell, on the trail so that _undo takes it back."""
+        geometry_ = self._geometry
+        occupancy = self._occupancy
+        tally = self._tally
+        trail = self._trail
+        trail.append((tally, _FILLED, tally[_FILLED]))
+        tally[_FILLED] += 1
+        for unit in geometry_.units_of_cell[index]:
+            slot = unit * geometry_.size + value_0
+            count = occupancy[slot]
+            trail.append((occupancy, slot, count))
+            occupancy[slot] = count + 1
+            if count:
+                trail.append((tally, _CONFLICTS, tally[_CONFLICTS]))
+                tally[_CONFLICTS] += 1
+
+    def _erase(self, index: int) -> None:
+        """
+        Empties a filled cell, on the trail like _position. Its value becomes a candidate again in the cell and
+        its peers wherever no unit has it placed, so the candidates have to be the ones computed from the values
+        (by _compute_candidate and _position, with nothing deduced since).
+        """
+        geometry_ = self._geometry
+        size = geometry_.size
+        cells = self._cells
+        candidates = self._candidates
+        occupancy = self._occupancy
+        tally = self._tally
+        trail = self._trail
+        value_0 = cells[index] - 1
+        bit = 1 << value_0
+        trail.append((cells, index, value_0 + 1))
+        cells[index] = 0
+        trail.append((tally, _FILLED, tally[_FILLED]))
+        tally[_FILLED] -= 1
+        placed = (self._rows, self._columns, self._squares)
+        for unit in geometry_.units_of_cell[index]:
+            slot = unit * size + value_0
+            count = occupancy[slot]
+            trail.append((occupancy, slot, count))
+            occupancy[slot] = count - 1
+            if count > 1:
+                trail.append((tally, _CONFLICTS, tally[_CONFLICTS]))
+                tally[_CONFLICTS] -= 1
+            else:
+                masks = placed[unit // size]
+                trail.append((masks, unit % size, masks[unit % size]))
+                masks[unit % size] &= ~bit
+
+        self._restore(index, geometry_.all_candidates & ~self._placed_around(index))
+        for peer in geometry_.peers[index]:
+            if not cells[peer] and not candidates[peer] & bit and not self._placed_around(peer) & bit:
+                self._restore(peer, candidates[peer] | bit)
+
+    def _placed_around(self, index: int) -> int:
+        # values placed in the row, column and square of the cell
+        geometry_ = self._geometry
+        size = geometry_.size
+        return self._rows[index // size] | self._columns[index % size] | self._squares[geometry_.square_of_cell[index]]
+
+    def _restore(self, index: int, mask: int) -> None:
+        self._trail.append((self._candidates, index, self._candidates[index]))
+        self._candidates[index] = mask
+        self.__changed(index, mask)
+
+    def _deduce_all(self) -> bool:
+        """Like _deduce_candidates, with every empty cell and its units pending again first."""
+        cells = self._cells
+        candidates = self._candidates
+        for index in range(len(cells)):
+            if not cells[index]:
+                self.__changed(index, candidates[index])
+        return self._deduce_candidates()
+
+
+def _bit_counts(bits: int) -> bytearray:
+    result = bytearray(1 << bits)
+    for mask in range(1, 1 << bits):
+        result[mask] = result[mask >> 1] + (mask & 1)
+    return result
+
+
+# number of bits set in every mask of up to 13 bits (two lookups cover the 25 values of the largest grids)
+_BITS = _bit_counts(13)
+
+
+def _count(mask: int) -> int:
+    return _BITS[mask & 0x1FFF] + _BITS[mask >> 13]
+
+
+class _InstrumentedSudoku(Sudoku):
+    """A Sudoku with stats: adds the time of each phase (see SearchStats.PHASES) to them."""
+    __slots__ = ()
+
+    def is_correct(self) -> bool:
+        return _timed(self, 'is_correct', super().is_correct)
+
+    def _compute_candidate(self) -> None:
+        _timed(self, '_compute_candidate', super()._compute_candidate)
+
+    def _deduce_candidates(self) -> bool:
+        assert self.stats is not None
+        filled = self._occupied_cells()
+        result = _timed(self, '_deduce_candidates', super()._deduce_candidates)
+        self.stats.deduced += self._occupied_cells() - filled
+        return result
+
+    def _choices(self) -> Iterator[Choice]:
+        assert self.stats is not None
+        seconds = self.stats.seconds
+        iterator = super()._choices()
+        while True:
+            start = time.perf_counter()
+            try:
+                choice = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds['_choices'] += time.perf_counter() - start
+            yield choice
+
+
+def _timed(sudoku: Sudoku, phase: str, method: Callable[[], T]) -> T:
+    assert sudoku.stats is not None
+    start = time.perf_counter()
+    try:
+        return method()
+    finally:
+        sudoku.stats.seconds[phase] += time.perf_counter() - start
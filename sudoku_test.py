@@ -1,12 +1,30 @@
+import random
+import threading
+import tracemalloc
 import unittest
+import weakref
+from typing import List, Optional
 
 from logzero import logger  # type: ignore
 
 from project_io import IO
-from sudoku import Sudoku, SIZE
+from sudoku import Sudoku, SearchBudget, SearchStats, SIZE, ALL_CANDIDATES, geometry
 
 
 class TestSudoku(unittest.TestCase):
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+    easy49 = [
+        ".....3.17",
+        ".15..9..8",
+        ".6.......",
+        "1....7...",
+        "..9...2..",
+        "...5....4",
+        ".......2.",
+        "5..6..34.",
+        "34.2....."
+    ]
+
     def test_roundtrip_loading(self) -> None:
         io = IO()
         raw_values = [
@@ -196,11 +214,12 @@ class TestSudoku(unittest.TestCase):
         self.assertTrue(sudoku.is_complete())
 
     def test_find_square(self) -> None:
+        sudoku = self.empty_sudoku()
         map_square = [[0, 0, 0, 0, 0, 0, 0, 0, 0] for _ in range(0, SIZE)]
 
         for row in range(0, SIZE):
             for column in range(0, SIZE):
-                map_square[row][column] = Sudoku._square_for(row, column)
+                map_square[row][column] = sudoku._square_for(row, column)
 
         self.assertEqual(
             [[0, 0, 0, 1, 1, 1, 2, 2, 2],
@@ -216,6 +235,265 @@ class TestSudoku(unittest.TestCase):
              [6, 6, 6, 7, 7, 7, 8, 8, 8]],
             map_square)
 
+    def test_solved_sudoku_is_not_kept_alive(self) -> None:
+        sudoku = IO().load(self.easy49)
+        sudoku.solve()
+        reference = weakref.ref(sudoku)
+
+        del sudoku
+
+        self.assertIsNone(reference())
+
+    def test_value_is_a_read_only_view(self) -> None:
+        value = IO().load_generic(self.easy49)
+        sudoku = Sudoku(value)
+
+        self.assertEqual(value, sudoku.value)
+        self.assertEqual((None, None, None, None, None, 3, None, 1, 7), sudoku.value[0])
+        with self.assertRaises(TypeError):
+            sudoku.value[0][0] = 2  # type: ignore
+        sudoku.solve()
+        self.assertEqual([None, None, None, None, None, 3, None, 1, 7], value[0])
+        self.assertNotIn(None, sudoku.value[0])
+        self.assertFalse(hasattr(sudoku, '__dict__'))
+
+    def test_memory_stays_flat_across_solves(self) -> None:
+        def solve_many() -> None:
+            for _ in range(20):
+                IO().load(self.easy49).solve()
+
+        solve_many()
+        tracemalloc.start()
+        try:
+            solve_many()
+            before = tracemalloc.get_traced_memory()[0]
+            solve_many()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(after - before, 10_000)
+
+    def test_compute_candidates_as_bit_masks(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/solved1.sud
+        raw_values = [
+            "123456789",
+            " 56789123",
+            "789123456",
+            "214365897",
+            "36589721 ",
+            "89721 365",
+            "5 16 2978",
+            "6 2978531",
+            "978531642"
+        ]
+        sudoku = IO().load(raw_values)
+
+        sudoku._compute_candidate()
+
+        self.assertEqual(1 << (4 - 1), sudoku._candidates[1 * SIZE + 0])
+        self.assertEqual(1 << (4 - 1), sudoku._candidates[4 * SIZE + 8])
+        self.assertEqual((1 << (3 - 1)) | (1 << (4 - 1)), sudoku._candidates[6 * SIZE + 1])
+        self.assertEqual(0, sudoku._candidates[0])
+
+    def test_undo_restores_values_and_candidates(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+        raw_values = [
+            ".....3.17",
+            ".15..9..8",
+            ".6.......",
+            "1....7...",
+            "..9...2..",
+            "...5....4",
+            ".......2.",
+            "5..6..34.",
+            "34.2....."
+        ]
+        sudoku = IO().load(raw_values)
+        sudoku._compute_candidate()
+        values = IO().serialize(sudoku)
+        candidates = list(sudoku._candidates)
+
+        mark = len(sudoku._trail)
+        sudoku._position(0, 0, 2)
+        sudoku._deduce_candidates()
+        sudoku._undo(mark)
+
+        self.assertEqual(values, IO().serialize(sudoku))
+        self.assertEqual(candidates, list(sudoku._candidates))
+
+    def test_undo_restores_correctness_and_completeness(self) -> None:
+        sudoku = self.empty_sudoku()
+        sudoku._compute_candidate()
+        mark = len(sudoku._trail)
+
+        sudoku._position(0, 0, 5)
+        self.assertEqual(1, sudoku._occupied_cells())
+        self.assertTrue(sudoku.is_correct())
+        # repeated in a square and in a row, which the propagation never does
+        sudoku._position(1, 1, 5)
+        sudoku._position(0, 8, 5)
+        self.assertFalse(sudoku.is_correct())
+
+        sudoku._undo(mark)
+
+        self.assertTrue(sudoku.is_correct())
+        self.assertEqual(0, sudoku._occupied_cells())
+        self.assertFalse(sudoku.is_complete())
+
+    def empty_sudoku(self) -> Sudoku:
+        sudoku = IO().load(["         "] * SIZE)
+        sudoku._compute_candidate()
+        sudoku._clear_pending()
+        return sudoku
+
+    def test_box_line_reduction(self) -> None:
+        sudoku = self.empty_sudoku()
+        for column in range(3, SIZE):
+            sudoku._eliminate(0 * SIZE + column, 1 << 0)
+
+        sudoku._locked_candidates_in(0)
+
+        for index in [1 * SIZE + 0, 1 * SIZE + 2, 2 * SIZE + 1]:
+            self.assertFalse(sudoku._candidates[index] & (1 << 0))
+        self.assertTrue(sudoku._candidates[0 * SIZE + 0] & (1 << 0))
+        self.assertTrue(sudoku._candidates[3 * SIZE + 0] & (1 << 0))
+
+    def test_pointing(self) -> None:
+        sudoku = self.empty_sudoku()
+        for index in [1 * SIZE + 0, 1 * SIZE + 1, 1 * SIZE + 2, 2 * SIZE + 0, 2 * SIZE + 1, 2 * SIZE + 2]:
+            sudoku._eliminate(index, 1 << 4)
+
+        sudoku._locked_candidates_in(2 * SIZE + 0)
+
+        for column in range(3, SIZE):
+            self.assertFalse(sudoku._candidates[0 * SIZE + column] & (1 << 4))
+        self.assertTrue(sudoku._candidates[0 * SIZE + 0] & (1 << 4))
+        self.assertTrue(sudoku._candidates[1 * SIZE + 3] & (1 << 4))
+
+    def test_naked_pair(self) -> None:
+        sudoku = self.empty_sudoku()
+        pair = (1 << 0) | (1 << 1)
+        sudoku._eliminate(0 * SIZE + 2, ~pair)
+        sudoku._eliminate(0 * SIZE + 7, ~pair)
+
+        self.assertTrue(sudoku._naked_subsets_in(0))
+
+        self.assertEqual(pair, sudoku._candidates[0 * SIZE + 2])
+        self.assertEqual(pair, sudoku._candidates[0 * SIZE + 7])
+        for column in [0, 1, 3, 4, 5, 6, 8]:
+            self.assertEqual(ALL_CANDIDATES & ~pair, sudoku._candidates[0 * SIZE + column])
+        self.assertEqual(ALL_CANDIDATES, sudoku._candidates[1 * SIZE + 0])
+
+    def test_naked_triple_with_too_few_candidates(self) -> None:
+        sudoku = self.empty_sudoku()
+        for column in range(3):
+            sudoku._eliminate(0 * SIZE + column, ~((1 << 0) | (1 << 1)))
+
+        self.assertFalse(sudoku._naked_subsets_in(0))
+
+    def test_choices_for_cell_with_fewest_candidates(self) -> None:
+        sudoku = self.empty_sudoku()
+        sudoku._eliminate(4 * SIZE + 4, ~((1 << (3 - 1)) | (1 << (7 - 1))))
+        sudoku._eliminate(5 * SIZE + 5, 1 << 0)
+
+        self.assertEqual([(4, 4, 3), (4, 4, 7)], list(sudoku._choices()))
+
+    def test_choices_for_value_with_fewest_places_in_unit(self) -> None:
+        sudoku = self.empty_sudoku()
+        for column in [0, 2, 3, 4, 5, 7, 8]:
+            sudoku._eliminate(2 * SIZE + column, 1 << (5 - 1))
+
+        self.assertEqual([(2, 1, 5), (2, 6, 5)], list(sudoku._choices()))
+        self.assertEqual([(0, 0, value) for value in range(1, SIZE + 1)], list(self.empty_sudoku()._choices()))
+
+    def test_choices_for_value_with_three_places_in_unit(self) -> None:
+        sudoku = self.empty_sudoku()
+        for column in [0, 2, 3, 5, 7, 8]:
+            sudoku._eliminate(2 * SIZE + column, 1 << (5 - 1))
+
+        self.assertEqual([(2, 1, 5), (2, 4, 5), (2, 6, 5)], list(sudoku._choices()))
+
+        # ties go to the cell
+        sudoku._eliminate(7 * SIZE + 7, ~0b111)
+        self.assertEqual([(7, 7, 1), (7, 7, 2), (7, 7, 3)], list(sudoku._choices()))
+
+    def test_deduce_without_search(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+        raw_values = [
+            "  3 2 6  ",
+            "9  3 5  1",
+            "  18 64  ",
+            "  81 29  ",
+            "7       8",
+            "  67 82  ",
+            "  26 95  ",
+            "8  2 3  9",
+            "  5 1 3  ",
+        ]
+        sudoku = IO().load(raw_values)
+        sudoku._compute_candidate()
+
+        self.assertTrue(sudoku._deduce_candidates())
+
+        self.assertTrue(sudoku.is_complete())
+        self.assertTrue(sudoku.is_correct())
+
+    def test_deduce_finds_contradiction(self) -> None:
+        raw_values = [
+            "12345678 ",
+            "        9",
+            "         ",
+            "         ",
+            "         ",
+            "         ",
+            "         ",
+            "         ",
+            "         "
+        ]
+        sudoku = IO().load(raw_values)
+        sudoku._compute_candidate()
+
+        self.assertTrue(sudoku.is_correct())
+        self.assertFalse(sudoku._deduce_candidates())
+
+    def test_search_stats(self) -> None:
+        # Arto Inkala's puzzle, https://www.conceptispuzzles.com/index.aspx?uri=info/article/424
+        raw_values = [
+            "8........",
+            "..36.....",
+            ".7..9.2..",
+            ".5...7...",
+            "....457..",
+            "...1...3.",
+            "..1....68",
+            "..85...1.",
+            ".9....4.."
+        ]
+        stats = SearchStats()
+        sudoku = Sudoku(IO().load_generic(raw_values), stats)
+        empty = SIZE * SIZE - sudoku._occupied_cells()
+
+        sudoku.solve()
+
+        self.assertTrue(sudoku.is_complete())
+        self.assertGreaterEqual(stats.nodes, 1)
+        self.assertGreaterEqual(stats.max_depth, 1)
+        self.assertGreaterEqual(stats.guessed, stats.backtracks)
+        # the cells filled on the branches that were undone are counted too
+        self.assertGreaterEqual(stats.deduced + stats.guessed, empty)
+        for phase in SearchStats.PHASES:
+            self.assertGreater(stats.seconds[phase], 0)
+        self.assertEqual(['nodes', 'backtracks', 'max_depth', 'deduced', 'guessed', 'seconds_is_correct',
+                          'seconds_compute_candidate', 'seconds_deduce_candidates', 'seconds_choices'],
+                         list(stats.as_dict()))
+
+    def test_no_instrumentation_without_stats(self) -> None:
+        sudoku = self.empty_sudoku()
+
+        self.assertIsNone(sudoku.stats)
+        self.assertIs(Sudoku, type(sudoku))
+
     def test_complete_simple_without_ambiguity_2(self) -> None:
         # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
         raw_values = [
@@ -276,6 +554,245 @@ class TestSudoku(unittest.TestCase):
         self.assertTrue(sudoku.is_correct())
         self.assertTrue(sudoku.is_complete())
 
+    def test_count_solutions(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        raw_values = [
+            ".........",
+            "9..3.5..1",
+            "..18.64..",
+            "..81.29..",
+            "7.......8",
+            "..67.82..",
+            "..26.95..",
+            "8..2.3..9",
+            "..5.1.3.."
+        ]
+        value = IO().load_generic(raw_values)
+        sudoku = Sudoku([list(row) for row in value])
+
+        self.assertEqual(37, sudoku.count_solutions())
+        self.assertEqual(2, sudoku.count_solutions(limit=2))
+        self.assertFalse(sudoku.is_unique())
+        self.assertEqual(value, sudoku.value)
+
+    def test_erase_gives_back_the_candidates(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+        sudoku = IO().load(self.easy49)
+        sudoku.solve()
+        solution = [list(row) for row in sudoku.value]
+        sudoku._compute_candidate()
+        erased = [list(row) for row in solution]
+
+        for index in [0, 40, 41, 80, 8, 36]:
+            sudoku._erase(index)
+            erased[index // SIZE][index % SIZE] = None
+
+        expected = Sudoku(erased)
+        expected._compute_candidate()
+        self.assertEqual(expected._candidates, sudoku._candidates)
+        self.assertEqual(erased, sudoku.value)
+        self.assertEqual(SIZE * SIZE - 6, sudoku._occupied_cells())
+        sudoku._undo(0)
+        self.assertEqual(solution, sudoku.value)
+        self.assertTrue(sudoku.is_complete())
+
+    def test_iter_solutions(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        raw_values = [
+            ".........",
+            "9..3.5..1",
+            "..18.64..",
+            "..81.29..",
+            "7.......8",
+            "..67.82..",
+            "..26.95..",
+            "8..2.3..9",
+            "..5.1.3.."
+        ]
+        value = IO().load_generic(raw_values)
+        sudoku = Sudoku([list(row) for row in value])
+
+        solutions = list(sudoku.iter_solutions())
+
+        self.assertEqual(37, len(solutions))
+        self.assertEqual(37, len({IO.serialize_line(solution) for solution in solutions}))
+        for solution in solutions:
+            self.assertTrue(Sudoku([list(row) for row in solution]).is_complete())
+            self.assertTrue(Sudoku([list(row) for row in solution]).is_correct())
+        self.assertEqual(value, sudoku.value)
+
+    def test_iter_solutions_suspends_between_solutions(self) -> None:
+        sudoku = self.empty_sudoku()
+        solutions = sudoku.iter_solutions()
+
+        first = next(solutions)
+        self.assertEqual(first, sudoku.value)
+        second = next(solutions)
+        solutions.close()
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(0, sudoku._occupied_cells())
+
+    def test_count_solutions_stops_at_limit(self) -> None:
+        self.assertEqual(5, self.empty_sudoku().count_solutions(limit=5))
+        self.assertEqual(0, self.empty_sudoku().count_solutions(limit=0))
+
+    def test_is_unique(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+        raw_values = [
+            ".....3.17",
+            ".15..9..8",
+            ".6.......",
+            "1....7...",
+            "..9...2..",
+            "...5....4",
+            ".......2.",
+            "5..6..34.",
+            "34.2....."
+        ]
+        sudoku = IO().load(raw_values)
+
+        self.assertTrue(sudoku.is_unique())
+        self.assertFalse(sudoku.is_complete())
+
+    def test_count_solutions_of_impossible_sudoku(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+        raw_values = [
+            "36..712..",
+            ".5....18.",
+            "..92.47..",
+            "....13.28",
+            "4..1.2..9",
+            "27.46....",
+            "..53.89..",
+            ".83....6.",
+            "..769..43"
+        ]
+
+        self.assertEqual(0, IO().load(raw_values).count_solutions())
+
+    def test_search_stops_when_budget_is_exhausted(self) -> None:
+        # Arto Inkala's puzzle, https://www.conceptispuzzles.com/index.aspx?uri=info/article/424
+        raw_values = [
+            "8........",
+            "..36.....",
+            ".7..9.2..",
+            ".5...7...",
+            "....457..",
+            "...1...3.",
+            "..1....68",
+            "..85...1.",
+            ".9....4.."
+        ]
+        sudoku = IO().load(raw_values)
+        budget = SearchBudget(max_nodes=2)
+
+        result = sudoku.solve(budget=budget)
+
+        self.assertEqual('budget_exhausted', result['status'])
+        self.assertTrue(budget.exhausted)
+        self.assertEqual(3, budget.nodes)
+        self.assertFalse(sudoku.is_complete())
+        self.assertEqual(IO().load_generic(raw_values), sudoku.value)
+        # the deepest state reached: a guess and what follows from it
+        self.assertTrue(Sudoku(result['value']).is_correct())
+        self.assertGreater(Sudoku(result['value'])._occupied_cells(), sudoku._occupied_cells())
+
+    def test_solve_status(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+        easy = IO().load_generic(["  3 2 6  ", "9  3 5  1", "  18 64  ", "  81 29  ", "7       8", "  67 82  ",
+                                  "  26 95  ", "8  2 3  9", "  5 1 3  "])
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+        impossible = IO().load_generic(["36..712..", ".5....18.", "..92.47..", "....13.28", "4..1.2..9",
+                                        "27.46....", "..53.89..", ".83....6.", "..769..43"])
+
+        solved = Sudoku(easy).solve(max_nodes=0)
+        unsolvable = Sudoku(impossible).solve()
+        exhausted = self.empty_sudoku().solve(deadline=0)
+
+        self.assertEqual('solved', solved['status'])
+        self.assertTrue(Sudoku(solved['value']).is_complete())
+        self.assertEqual('unsolvable', unsolvable['status'])
+        self.assertEqual('budget_exhausted', exhausted['status'])
+        self.assertEqual([[None] * SIZE] * SIZE, exhausted['value'])
+
+    def test_search_stops_at_deadline(self) -> None:
+        budget = SearchBudget(deadline=0)
+
+        self.assertEqual(0, self.empty_sudoku().count_solutions(budget=budget))
+        self.assertTrue(budget.exhausted)
+
+    def test_cancelled_search(self) -> None:
+        budget = SearchBudget()
+        budget.cancel()
+
+        self.assertFalse(budget.spend())
+
+    def test_search_stops_when_event_is_set(self) -> None:
+        event = threading.Event()
+        budget = SearchBudget(event=event)
+        self.assertTrue(budget.spend())
+
+        event.set()
+
+        self.assertTrue(all(budget.spend() for _ in range(SearchBudget.CLOCK_INTERVAL - 1)))
+        self.assertFalse(budget.spend())
+
+    def test_subproblems_partition_the_solutions(self) -> None:
+        # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud, without its first row
+        raw_values = [
+            ".........",
+            "9..3.5..1",
+            "..18.64..",
+            "..81.29..",
+            "7.......8",
+            "..67.82..",
+            "..26.95..",
+            "8..2.3..9",
+            "..5.1.3.."
+        ]
+        sudoku = IO().load(raw_values)
+
+        subproblems = list(sudoku.subproblems())
+
+        self.assertGreater(len(subproblems), 1)
+        self.assertEqual(37, sum(Sudoku.from_packed(cells).count_solutions() for cells in subproblems))
+        self.assertEqual(IO().load_generic(raw_values), sudoku.value)
+
+    @staticmethod
+    def pattern_puzzle(box: int, blank: float) -> List[List[Optional[int]]]:
+        # a solution of the usual shifted pattern, with random values and cells left blank
+        size = box * box
+        random_ = random.Random(box)
+        values = random_.sample(range(1, size + 1), size)
+        return [[None if random_.random() < blank else values[(box * (row % box) + row // box + column) % size]
+                 for column in range(size)] for row in range(size)]
+
+    def test_solve_larger_grids(self) -> None:
+        for box in (4, 5):
+            with self.subTest(size=box * box):
+                value = self.pattern_puzzle(box, 0.6)
+                sudoku = Sudoku(value)
+
+                result = sudoku.solve()
+
+                self.assertEqual('solved', result['status'])
+                self.assertTrue(sudoku.is_complete() and sudoku.is_correct())
+                for row, solution_row in zip(value, sudoku.value):
+                    for cell, solution_cell in zip(row, solution_row):
+                        self.assertIn(cell, (None, solution_cell))
+
+    def test_geometry_is_shared_by_size(self) -> None:
+        first = Sudoku(self.pattern_puzzle(4, 0.5))
+        second = Sudoku.from_packed(bytes(16 * 16))
+
+        self.assertIs(first._geometry, second._geometry)
+        self.assertIs(geometry(16), first._geometry)
+        self.assertEqual(16, second.size)
+        self.assertEqual(3 * 15 - 2 * 3, len(geometry(16).peers[0]))
+        self.assertEqual([[row, column] for row in range(4, 8) for column in range(12, 16)],
+                         second.cells_for_square_at(5, 13))
+
     def test_fail_to_complete_impossible_sudoku(self) -> None:
         # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
         raw_values = [
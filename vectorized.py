@@ -0,0 +1,98 @@
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from sudoku import ALL_CANDIDATES, SIZE
+
+BOX: int = 3
+
+Grids = npt.NDArray[np.uint8]
+Masks = npt.NDArray[np.uint16]
+Mask = npt.NDArray[np.bool_]
+
+# value -> bit (value - 1), as in Sudoku._candidates; 0 (empty) -> no bit
+_BIT = np.array([0] + [1 << value_0 for value_0 in range(SIZE)], dtype=np.uint16)
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(ALL_CANDIDATES + 1)], dtype=np.uint8)
+# mask with a single bit -> its value; anything else -> 0
+_SINGLE_VALUE = np.array([mask.bit_length() if _POPCOUNT[mask] == 1 else 0 for mask in range(ALL_CANDIDATES + 1)],
+                         dtype=np.uint8)
+
+
+def as_grids(grids: npt.ArrayLike) -> Grids:
+    """(N, SIZE, SIZE) uint8 grids, 0 for the empty cells. Accepts (N, SIZE * SIZE) packed puzzles too."""
+    return np.asarray(grids, dtype=np.uint8).reshape(-1, SIZE, SIZE)
+
+
+def _by_square(per_cell: Masks) -> Masks:
+    # (N, row, column) -> (N, band, row in band, stack, column in stack)
+    return per_cell.reshape(-1, BOX, BOX, BOX, BOX)
+
+
+def _unit_masks(bits: Masks) -> Tuple[Masks, Masks, Masks]:
+    # bit masks of the values placed in each (N, row), (N, column) and (N, band, stack)
+    rows: Masks = np.bitwise_or.reduce(bits, axis=2)
+    columns: Masks = np.bitwise_or.reduce(bits, axis=1)
+    squares: Masks = np.bitwise_or.reduce(np.bitwise_or.reduce(_by_square(bits), axis=4), axis=2)
+    return rows, columns, squares
+
+
+def is_correct_batch(grids: npt.ArrayLike) -> Mask:
+    """Sudoku.is_correct for every grid: no value repeated in a row, column or square."""
+    bits = _BIT[as_grids(grids)]
+    rows, columns, squares = _unit_masks(bits)
+    # the sum of the bits of a unit is greater than their union only when some value is repeated
+    by_square = _by_square(bits).sum(axis=4, dtype=np.uint16).sum(axis=2, dtype=np.uint16)
+    result: Mask = ((bits.sum(axis=2, dtype=np.uint16) == rows).all(axis=1) &
+                    (bits.sum(axis=1, dtype=np.uint16) == columns).all(axis=1) &
+                    (by_square == squares).all(axis=(1, 2)))
+    return result
+
+
+def is_complete_batch(grids: npt.ArrayLike) -> Mask:
+    result: Mask = (as_grids(grids) != 0).all(axis=(1, 2))
+    return result
+
+
+def candidate_masks_batch(grids: npt.ArrayLike) -> Masks:
+    """Sudoku._candidates for every grid, as (N, row, column) bit masks."""
+    grids = as_grids(grids)
+    rows, columns, squares = _unit_masks(_BIT[grids])
+    used = (rows.reshape(-1, BOX, BOX, 1, 1) | columns.reshape(-1, 1, 1, BOX, BOX) |
+            squares.reshape(-1, BOX, 1, BOX, 1)).reshape(-1, SIZE, SIZE)
+    result: Masks = np.where(grids == 0, ~used & ALL_CANDIDATES, 0).astype(np.uint16)
+    return result
+
+
+def candidates_batch(grids: npt.ArrayLike) -> Mask:
+    """
+    Sudoku._compute_candidate for every grid: (N, row, column, value_0) is True when value_0 + 1 can still
+    be placed in that empty cell.
+    """
+    masks = candidate_masks_batch(grids)
+    result: Mask = (masks[..., None] & _BIT[1:]) != 0
+    return result
+
+
+def naked_singles_batch(grids: npt.ArrayLike) -> Tuple[Grids, Mask]:
+    """
+    Fills every empty cell that has a single candidate, in all the grids at once, until no grid changes.
+    Returns the filled grids and which of them are still valid: not incorrect and without empty cells that
+    have no candidates. The valid and complete grids are solved; only the rest need a search.
+    """
+    result = as_grids(grids).copy()
+    valid = is_correct_batch(result)
+    active = np.flatnonzero(valid)
+    while active.size:
+        subset = result[active]
+        masks = candidate_masks_batch(subset)
+        empty = subset == 0
+        dead_end = (empty & (masks == 0)).any(axis=(1, 2))
+        singles = _SINGLE_VALUE[masks]
+        subset = np.where(empty, singles, subset)
+        result[active] = subset
+
+        failed = dead_end | ~is_correct_batch(subset)
+        valid[active[failed]] = False
+        active = active[(singles != 0).any(axis=(1, 2)) & ~failed]
+    return result, valid
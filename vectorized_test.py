@@ -0,0 +1,112 @@
+import unittest
+from typing import List
+
+import numpy as np
+
+from project_io import IO
+from sudoku import Sudoku
+from vectorized import Grids, candidates_batch, is_complete_batch, is_correct_batch, naked_singles_batch
+
+
+class TestVectorized(unittest.TestCase):
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/solved1.sud
+    solved = [
+        "123456789",
+        "456789123",
+        "789123456",
+        "214365897",
+        "365897214",
+        "897214365",
+        "531642978",
+        "642978531",
+        "978531642"
+    ]
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy49.sud
+    ambiguous = [
+        ".....3.17",
+        ".15..9..8",
+        ".6.......",
+        "1....7...",
+        "..9...2..",
+        "...5....4",
+        ".......2.",
+        "5..6..34.",
+        "34.2....."
+    ]
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/impossible.sud
+    impossible = [
+        "36..712..",
+        ".5....18.",
+        "..92.47..",
+        "....13.28",
+        "4..1.2..9",
+        "27.46....",
+        "..53.89..",
+        ".83....6.",
+        "..769..43"
+    ]
+    repeated_in_square = [
+        "1........",
+        ".........",
+        "..1......",
+        ".........",
+        ".........",
+        ".........",
+        ".........",
+        ".........",
+        "........."
+    ]
+    # Source: https://github.com/jimburton/sudoku/blob/master/puzzles/easy1.sud
+    easy = [
+        "  3 2 6  ",
+        "9  3 5  1",
+        "  18 64  ",
+        "  81 29  ",
+        "7       8",
+        "  67 82  ",
+        "  26 95  ",
+        "8  2 3  9",
+        "  5 1 3  ",
+    ]
+
+    @staticmethod
+    def grids(*puzzles: List[str]) -> Grids:
+        return np.array([[[cell or 0 for cell in row] for row in IO().load_generic(puzzle)] for puzzle in puzzles],
+                        dtype=np.uint8)
+
+    def test_is_correct_batch(self) -> None:
+        puzzles = [self.solved, self.ambiguous, self.impossible, self.repeated_in_square]
+
+        actual = is_correct_batch(self.grids(*puzzles))
+
+        self.assertEqual([IO().load(puzzle).is_correct() for puzzle in puzzles], actual.tolist())
+        self.assertEqual([True, False, False, False], is_complete_batch(self.grids(*puzzles)).tolist())
+
+    def test_candidates_batch_matches_sudoku(self) -> None:
+        puzzles = [self.ambiguous, self.easy]
+
+        actual = candidates_batch(self.grids(*puzzles))
+
+        for index, puzzle in enumerate(puzzles):
+            sudoku = IO().load(puzzle)
+            sudoku._compute_candidate()
+            for row in range(9):
+                for column in range(9):
+                    expected = [bool(sudoku._candidates[row * 9 + column] & (1 << value_0)) for value_0 in range(9)]
+                    self.assertEqual(expected, actual[index, row, column].tolist())
+
+    def test_naked_singles_batch(self) -> None:
+        packed = self.grids(self.solved, self.easy, self.impossible, self.ambiguous).reshape(-1, 81)
+
+        grids, valid = naked_singles_batch(packed)
+
+        self.assertEqual([True, True, False, True], valid.tolist())
+        self.assertEqual([True, True, False, False], (valid & is_complete_batch(grids)).tolist())
+        sudoku = Sudoku([[int(cell) for cell in row] for row in grids[1]])
+        self.assertTrue(sudoku.is_correct())
+        self.assertTrue(sudoku.is_complete())
+        self.assertTrue((grids[3] == self.grids(self.ambiguous)[0]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()